@@ -1,3 +0,0 @@
-from .core import *
-from .interfaces import *
-from .plugins import *
\ No newline at end of file
@@ -1,19 +1,50 @@
+import importlib
+
 from .alert import Alert
-from .chiarpc import Chiarpc
-from .coinprice import Coinprice
+from .coinprice import Coinprice, Coinpriceservice
 from .config import Config
 from .conversions import Conversions, Byteunit
 from .csvexporter import CsvExporter
+from .database import Database
 from .exceptions import *
-from .hostdapi import Hostdapi
-from .hostdresponses import *
 from .interface import Interface
+from .jobstatistics import Jobstatistics
+from .jsonstream import Jsonstream
 from .messagecontainer import MessageContainer
 from .otherdefaultdict import otherdefaultdict
 from .plugin import Plugin
+from .registry import Registry
+from .requestgroup import request_all
+from .responsecache import Responsecache
+from .retrypolicy import Retrypolicy, Circuitbreaker
 from .scheduler import Scheduler
-from .siaapi import Siaapi
-from .siaresponses import *
-from .storjapi import Storjapi
-from .storjresponses import *
-from .tablerenderer import Tablerenderer
\ No newline at end of file
+from .sessionpool import Sessionpool
+from .tablerenderer import Tablerenderer
+
+# these modules pull in aiohttp, ciso8601 or ssl,
+# so they are imported on first use only
+_lazy_attributes = {
+    'Chiarpc': 'chiarpc',
+    'Hostdapi': 'hostdapi',
+    'Hostdconsensusdata': 'hostdresponses',
+    'Hostdwalletdata': 'hostdresponses',
+    'Hostdmetricsdata': 'hostdresponses',
+    'Siaapi': 'siaapi',
+    'Siaconsensusdata': 'siaresponses',
+    'Siablockdata': 'siaresponses',
+    'Siawalletdata': 'siaresponses',
+    'Siahostdata': 'siaresponses',
+    'Siastoragedata': 'siaresponses',
+    'Siatrafficdata': 'siaresponses',
+    'Siacontractsdata': 'siaresponses',
+    'Storjapi': 'storjapi',
+    'Storjnodedata': 'storjresponses',
+    'Storjpayoutdata': 'storjresponses'
+}
+
+def __getattr__(name):
+    if name not in _lazy_attributes:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_lazy_attributes[name]}', __name__), name)
+    globals()[name] = value
+    return value
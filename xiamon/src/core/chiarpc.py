@@ -1,23 +1,40 @@
+import aiohttp, json
 from ssl import SSLContext
 from .plugin import Plugin
-from .exceptions import ApiRequestFailedException
+from .exceptions import ApiRequestFailedException, ApiTransientException
+from .responsecache import Responsecache
+from .retrypolicy import Retrypolicy
+from .sessionpool import Sessionpool
 
 class Chiarpc:
-    def __init__(self, host, cert, key, plugin):
+    def __init__(self, host, cert, key, plugin, cache=None):
         self.__host = host
         self.__context = SSLContext()
         self.__context.load_cert_chain(cert, keyfile=key)
         self.__plugin = plugin
+        self.__cache = cache if cache is not None else Responsecache()
+        self.__retry = Retrypolicy()
+
+    def create_session(self):
+        return Sessionpool.session(self.__host)
 
     async def post(self, session, cmd, input={}):
+        key = f'{cmd}{json.dumps(input, sort_keys=True)}'
+        return await self.__cache.get(cmd, key,
+            lambda: self.__retry.run(self.__host, lambda: self.__post(session, cmd, input), self.__plugin.msg.debug))
+
+    async def __post(self, session, cmd, input):
         data = {}
         try:
             async with session.post(f'https://{self.__host}/{cmd}', json=input, ssl_context=self.__context) as response:
                 response.raise_for_status()
                 data = await response.json()
+        except aiohttp.ClientResponseError as e:
+            self.__plugin.msg.debug(f'Command {cmd} failed: {str(e)}')
+            raise ApiTransientException() if e.status >= 500 or e.status == 429 else ApiRequestFailedException()
         except Exception as e:
             self.__plugin.msg.debug(f'Command {cmd} failed: {str(e)}')
-            raise ApiRequestFailedException()
+            raise ApiTransientException()
         if data['success'] != True and data['success'] != 'true':
             self.__plugin.msg.debug(f'Command {cmd} returned no success.')
             raise ApiRequestFailedException()
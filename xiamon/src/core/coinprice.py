@@ -1,10 +1,85 @@
-import aiohttp
+import asyncio, time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from .sessionpool import Sessionpool
+
+class Coinpriceservice:
+    url = 'https://api.coingecko.com/api/v3'
+    ttl = 300
+
+    __ids = set()
+    __currencies = set()
+    __prices = {}
+    __pending = None
+    __failed = None
+
+    @classmethod
+    def configure(cls, config):
+        if config is None:
+            return
+        cls.url = config.get(cls.url, 'url').rstrip('/')
+        cls.ttl = config.get(cls.ttl, 'ttl')
+
+    @classmethod
+    def register(cls, id, currency):
+        cls.__ids.add(id)
+        cls.__currencies.add(currency)
+
+    @classmethod
+    async def get(cls, id, currency, log=None):
+        cls.register(id, currency)
+        # after a failed request the next one is sent when the ttl expired, so an outage does not cause a request per call
+        failed = cls.__failed is not None and time.monotonic() - cls.__failed < cls.ttl
+        if cls.__get_fresh(id, currency) is None and not failed:
+            # all registered coins and currencies are requested at once, so concurrent callers share one request
+            if cls.__pending is None:
+                cls.__pending = asyncio.ensure_future(cls.__update(log))
+            await asyncio.shield(cls.__pending)
+        return cls.__get_fresh(id, currency)
+
+    @classmethod
+    def __get_fresh(cls, id, currency):
+        entry = cls.__prices.get((id, currency), None)
+        if entry is None or time.monotonic() - entry[0] >= cls.ttl:
+            return None
+        return entry[1]
+
+    @classmethod
+    async def __update(cls, log):
+        ids = ','.join(sorted(cls.__ids))
+        currencies = ','.join(sorted(cls.__currencies))
+        try:
+            async with Sessionpool.session(urlparse(cls.url).netloc) as session:
+                async with session.get(f'{cls.url}/simple/price', params={'ids': ids, 'vs_currencies': currencies}) as response:
+                    status = response.status
+                    json = await response.json() if status >= 200 and status <= 299 else None
+            if json is not None:
+                now = time.monotonic()
+                for id, prices in json.items():
+                    for currency, price in prices.items():
+                        cls.__prices[(id, currency)] = (now, price)
+                cls.__failed = None
+                return
+            reason = f'status {status}'
+        except Exception as e:
+            reason = str(e)
+        finally:
+            cls.__pending = None
+        cls.__failed = time.monotonic()
+        if log is not None:
+            log(f'Coinprice request failed: {reason}')
 
 class Coinprice:
-    def __init__(self, id, currency):
+    fallback_max_age = timedelta(days=7)
+
+    def __init__(self, id, currency, fallback=None, log=None):
         self.__id = id
         self.__currency = currency
+        self.__fallback = fallback
+        self.__log = log
         self.__price = None
+        self.__fresh = False
+        Coinpriceservice.register(id, currency)
 
     @property
     def currency(self):
@@ -14,21 +89,18 @@ class Coinprice:
     def price(self):
         return self.__price
 
+    @property
+    def fresh(self):
+        return self.__fresh
+
     async def update(self):
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f'https://api.coingecko.com/api/v3/simple/price?ids={self.__id}&vs_currencies={self.__currency}') as response:
-                    json = await response.json()
-                    status = response.status
-                    if status >= 200 and status <= 299:
-                        self.__price = json[self.__id][self.__currency]
-                        return True
-                    else:
-                        self.__price = None
-                        return False
-        except:
-            self.__price = None
-            return False
+        self.__price = await Coinpriceservice.get(self.__id, self.__currency, self.__log)
+        self.__fresh = self.__price is not None
+        if self.__price is None and self.__fallback is not None:
+            timestamp, price = self.__fallback()
+            if timestamp is not None and datetime.now() - timestamp <= self.fallback_max_age:
+                self.__price = price
+        return self.__price is not None
 
     def to_fiat(self, balance, digits=None):
         if self.__price is None:
@@ -0,0 +1,98 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+class Database:
+    statement_cache_size = 256
+
+    # WAL with synchronous NORMAL syncs on checkpoints only instead of on every commit,
+    # which saves most of the writes on sd cards and hdds
+    __pragmas = [
+        'PRAGMA journal_mode = WAL;',
+        'PRAGMA synchronous = NORMAL;',
+        'PRAGMA temp_store = MEMORY;',
+        'PRAGMA foreign_keys = ON;'
+    ]
+
+    def __init__(self, file, tables=(), migrations=()):
+        self.__path = Path(file)
+        if not self.__path.parent.exists():
+            raise FileNotFoundError(f'Path contains not existing directory: {file}')
+        # statements outside of a transaction are committed at once, transactions are started explicitly
+        self.__db = sqlite3.connect(self.__path, isolation_level=None, cached_statements=self.statement_cache_size)
+        self.__depth = 0
+        for pragma in self.__pragmas:
+            self.__db.execute(pragma)
+        with self.transaction():
+            for command in tables:
+                self.__db.execute(command)
+        self.__migrate(migrations)
+
+    def close(self):
+        # closing twice is allowed, the second call might come from the destructor of the owner in another thread
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+
+    @contextmanager
+    def transaction(self):
+        # nested transactions are merged into the outermost one, so it is committed only once
+        if self.__depth == 0:
+            self.__db.execute('BEGIN;')
+        self.__depth += 1
+        try:
+            yield
+        except:
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__db.execute('ROLLBACK;')
+            raise
+        else:
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__db.execute('COMMIT;')
+
+    def execute(self, command, data=tuple()):
+        return self.__db.execute(command, data)
+
+    def executemany(self, command, data):
+        with self.transaction():
+            self.__db.executemany(command, data)
+
+    def query(self, command, data=tuple()):
+        rows = self.__db.execute(command, data).fetchall()
+        if len(rows) == 0:
+            return None
+        return rows
+
+    def insert_sample(self, table, timestamp=None, **values):
+        timestamp = timestamp if timestamp is not None else datetime.now()
+        command = f'INSERT INTO {table}(timestamp, {", ".join(values)}) VALUES(?{",?" * len(values)});'
+        return self.__db.execute(command, (int(timestamp.timestamp()), *values.values())).lastrowid
+
+    def nearest_sample(self, table, columns, timestamp, max_distance=timedelta(minutes=5), **conditions):
+        # the closest samples before and after the timestamp are single index searches,
+        # the real timestamp is returned as well, so callers can use the real interval
+        unix = int(timestamp.timestamp())
+        filters = ''.join(f'{x} == ? AND ' for x in conditions)
+        candidates = []
+        for operator, order in (('<=', 'DESC'), ('>', 'ASC')):
+            command = f"""SELECT timestamp, {", ".join(columns)} FROM {table}
+                        WHERE {filters}timestamp {operator} ? ORDER BY timestamp {order} LIMIT 1;"""
+            rows = self.query(command, (*conditions.values(), unix))
+            if rows is not None and abs(rows[0][0] - unix) <= max_distance.total_seconds():
+                candidates.append(rows[0])
+        if len(candidates) == 0:
+            return None, None
+        nearest = min(candidates, key=lambda x: abs(x[0] - unix))
+        return datetime.fromtimestamp(nearest[0]), nearest[1:]
+
+    def __migrate(self, migrations):
+        # each migration is a list of statements, the number of applied ones is stored in the database itself
+        version = self.__db.execute('PRAGMA user_version;').fetchone()[0]
+        for number, migration in enumerate(migrations[version:], version + 1):
+            with self.transaction():
+                for command in migration:
+                    self.__db.execute(command)
+                self.__db.execute(f'PRAGMA user_version = {number};')
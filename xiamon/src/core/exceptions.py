@@ -2,3 +2,9 @@
 
 class ApiRequestFailedException(Exception):
     pass
+
+class ApiTransientException(ApiRequestFailedException):
+    pass
+
+class ApiNoAnswerException(ApiRequestFailedException):
+    pass
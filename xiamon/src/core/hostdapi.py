@@ -1,48 +1,49 @@
 import aiohttp, urllib.parse
 from .plugin import Plugin
-from .exceptions import ApiRequestFailedException
+from .exceptions import ApiRequestFailedException, ApiTransientException
+from .postrequest import post_request
+from .responsecache import Responsecache
+from .retrypolicy import Retrypolicy
+from .sessionpool import Sessionpool
 
 class Hostdapi:
-    def __init__(self, host, password, plugin):
+    def __init__(self, host, password, plugin, cache=None):
         self.__host = host
         self.__password = password
         self.__plugin = plugin
+        self.__cache = cache if cache is not None else Responsecache()
+        self.__retry = Retrypolicy()
 
     def create_session(self):
         auth = aiohttp.BasicAuth("", self.__password) if self.__password is not None else None
-        session = aiohttp.ClientSession(auth=auth)
-        return session
+        return Sessionpool.session(self.__host, auth=auth)
 
     async def get(self, session, cmd, input = {}):
+        parameters = []
+        for key, value in input.items():
+            parameters.append(f'{urllib.parse.quote(key)}={urllib.parse.quote(value)}')
+        payload = '?'+'&'.join(parameters) if len(parameters) > 0 else ''
+        return await self.__cache.get(cmd, f'{cmd}{payload}',
+            lambda: self.__retry.run(self.__host, lambda: self.__get(session, cmd, payload), self.__plugin.msg.debug))
+
+    async def __get(self, session, cmd, payload):
         try:
-            parameters = []
-            for key, value in input.items():
-                parameters.append(f'{urllib.parse.quote(key)}={urllib.parse.quote(value)}')
-            payload = '?'+'&'.join(parameters) if len(parameters) > 0 else ''
             async with session.get(f'http://{self.__host}/api/{cmd}{payload}') as response:
                 json = await response.json()
                 status = response.status
         except Exception as e:
             self.__plugin.msg.debug(f'Command {cmd} failed: {str(e)}')
-            raise ApiRequestFailedException()
+            raise ApiTransientException()
         if not (status >= 200 and status <= 299):
             self.__plugin.msg.debug(f'Command {cmd} returned status {status}.')
-            raise ApiRequestFailedException()
+            raise ApiTransientException() if status >= 500 or status == 429 else ApiRequestFailedException()
         return json
 
     async def post(self, session, cmd, input):
         try:
-            parameters = []
-            for key, value in input.items():
-                parameters.append(f'{key}={value}')
-            payload = '&'.join(parameters)
-            async with session.post(f'http://{self.__host}/{cmd}?{payload}') as response:
-                _ = await response.text()
-                status = response.status
-        except Exception as e:
-            self.__plugin.msg.debug(f'Command {cmd} failed: {str(e)}')
-            raise ApiRequestFailedException()
-        if not (status >= 200 and status <= 299):
-            self.__plugin.msg.debug(f'Command {cmd} returned status {status}.')
-            raise ApiRequestFailedException()
+            await self.__retry.run(self.__host, lambda: post_request(session, f'http://{self.__host}/{cmd}', cmd, input, self.__plugin.msg.debug),
+                self.__plugin.msg.debug, idempotent=False)
+        finally:
+            # also after a failure, the request might have been applied
+            self.__cache.invalidate()
 
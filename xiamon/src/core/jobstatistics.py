@@ -0,0 +1,82 @@
+import bisect
+from collections import defaultdict
+
+class Histogram:
+    def __init__(self, bounds):
+        self.__bounds = bounds
+        self.__counts = [0] * (len(bounds) + 1)
+        self.__count = 0
+        self.__total = 0.0
+        self.__maximum = None
+
+    def add(self, value):
+        self.__counts[bisect.bisect_left(self.__bounds, value)] += 1
+        self.__count += 1
+        self.__total += value
+        if self.__maximum is None or value > self.__maximum:
+            self.__maximum = value
+
+    @property
+    def bounds(self):
+        return self.__bounds
+
+    @property
+    def counts(self):
+        return list(self.__counts)
+
+    @property
+    def count(self):
+        return self.__count
+
+    @property
+    def mean(self):
+        return self.__total / self.__count if self.__count > 0 else None
+
+    @property
+    def maximum(self):
+        return self.__maximum
+
+class Jobstatistics:
+    # upper bounds of the histogram buckets in seconds, the last bucket takes all larger values
+    buckets = (1, 5, 15, 60, 300, 900, 3600)
+
+    def __init__(self):
+        self.__lag = Histogram(self.buckets)
+        self.__duration = Histogram(self.buckets)
+        self.__successes = 0
+        self.__failures = 0
+        self.__exceptions = defaultdict(lambda: 0)
+
+    def add(self, lag, duration, exception=None):
+        if lag is not None:
+            self.__lag.add(max(0.0, lag))
+        self.__duration.add(duration)
+        if exception is None:
+            self.__successes += 1
+        else:
+            self.__failures += 1
+            self.__exceptions[exception] += 1
+
+    @property
+    def lag(self):
+        return self.__lag
+
+    @property
+    def duration(self):
+        return self.__duration
+
+    @property
+    def runs(self):
+        return self.__successes + self.__failures
+
+    @property
+    def successes(self):
+        return self.__successes
+
+    @property
+    def failures(self):
+        return self.__failures
+
+    @property
+    def exceptions(self):
+        return dict(self.__exceptions)
@@ -0,0 +1,53 @@
+import codecs, json, re
+
+class Jsonstream:
+    chunk_size = 65536
+
+    __whitespace = re.compile(r'[\s,]*')
+
+    def __init__(self, key):
+        self.__key = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self.__decoder = json.JSONDecoder()
+
+    async def items(self, stream):
+        # walks the array under the given key object by object,
+        # so only the current chunk and the current item have to be kept in memory
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        chunks = stream.iter_chunked(self.chunk_size)
+        buffer = ''
+        position = None
+        eof = False
+        while True:
+            if position is None:
+                match = self.__key.search(buffer)
+                if match is not None:
+                    position = match.end()
+            else:
+                position = self.__whitespace.match(buffer, position).end()
+                if position < len(buffer):
+                    if buffer[position] == ']':
+                        return
+                    try:
+                        item, end = self.__decoder.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    else:
+                        # a number at the end of the buffer might continue in the next chunk
+                        if eof or end < len(buffer):
+                            position = end
+                            yield item
+                            continue
+            if eof:
+                raise ValueError('Unexpected end of data.')
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                chunk = b''
+                eof = True
+            if position is None:
+                # keep a tail, the key might be split between two chunks
+                buffer = buffer[-256:] + text_decoder.decode(chunk, eof)
+            else:
+                buffer = buffer[position:] + text_decoder.decode(chunk, eof)
+                position = 0
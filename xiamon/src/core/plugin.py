@@ -4,6 +4,7 @@ from .interface import Interface
 from .messagecontainer import AggregatedMessage, InstantMessage, MessageAggregator
 from .config import Config
 from .alert import Alert
+from .responsecache import Responsecache
 
 class Plugin(ABC):
     Channel = Interface.Channel
@@ -56,6 +57,12 @@ class Plugin(ABC):
         self.__message_container.flush()
         self.__message_container = None
 
+    def close(self):
+        pass
+
+    def response_cache(self):
+        return Responsecache(self.config.get(60, 'cache_ttl'), self.config.get(None, 'cache_ttls'))
+
     def message_aggregator(self):
         self.__message_container = AggregatedMessage(self)
         return MessageAggregator(self.__flush_message_container)
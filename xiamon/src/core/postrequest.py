@@ -0,0 +1,23 @@
+import aiohttp
+from .exceptions import ApiRequestFailedException, ApiTransientException, ApiNoAnswerException
+
+async def post_request(session, url, cmd, input, log):
+    parameters = []
+    for key, value in input.items():
+        parameters.append(f'{key}={value}')
+    payload = '&'.join(parameters)
+    try:
+        async with session.post(f'{url}?{payload}') as response:
+            _ = await response.text()
+            status = response.status
+    except aiohttp.ClientConnectorError as e:
+        # the connection was not established, so the host did not get the request
+        log(f'Command {cmd} failed: {str(e)}')
+        raise ApiTransientException()
+    except Exception as e:
+        # the request might have been applied already, so it must not be repeated
+        log(f'Command {cmd} failed: {str(e)}')
+        raise ApiNoAnswerException()
+    if not (status >= 200 and status <= 299):
+        log(f'Command {cmd} returned status {status}.')
+        raise ApiTransientException() if status == 429 else ApiRequestFailedException()
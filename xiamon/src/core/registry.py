@@ -0,0 +1,24 @@
+import importlib, time
+
+class Registry:
+    def __init__(self, package, items):
+        self.__package = package
+        self.__items = items
+        self.__classes = {}
+        self.__load_times = {}
+
+    def __contains__(self, name):
+        return name in self.__items
+
+    def load(self, name):
+        if name not in self.__classes:
+            module_name, class_name = self.__items[name].rsplit('.', 1)
+            start = time.perf_counter()
+            module = importlib.import_module(f'.{module_name}', self.__package)
+            self.__classes[name] = getattr(module, class_name)
+            self.__load_times[name] = time.perf_counter() - start
+        return self.__classes[name]
+
+    @property
+    def load_times(self):
+        return dict(self.__load_times)
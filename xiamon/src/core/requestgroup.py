@@ -0,0 +1,9 @@
+import asyncio
+
+async def request_all(*requests):
+    # all requests are sent at once, but the result is still all or nothing
+    results = await asyncio.gather(*requests, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
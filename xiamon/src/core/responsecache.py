@@ -0,0 +1,46 @@
+import asyncio, time
+from functools import partial
+
+class Responsecache:
+    def __init__(self, ttl=0, ttls=None):
+        self.__ttl = ttl
+        self.__ttls = ttls if ttls is not None else {}
+        self.__entries = {}
+        self.__pending = {}
+        self.__generation = 0
+
+    async def get(self, cmd, key, request):
+        entry = self.__entries.get(key, None)
+        if entry is not None and entry[0] > time.monotonic():
+            return self.__copy(entry[1])
+        # identical requests running at the same time share one result
+        task = self.__pending.get(key, None)
+        if task is None:
+            task = asyncio.ensure_future(request())
+            self.__pending[key] = task
+            task.add_done_callback(partial(self.__finished, key, self.__ttls.get(cmd, self.__ttl), self.__generation))
+        return self.__copy(await asyncio.shield(task))
+
+    def invalidate(self):
+        # requests started before are not shared or stored anymore, their results might be outdated
+        self.__entries.clear()
+        self.__pending.clear()
+        self.__generation += 1
+
+    def __finished(self, key, ttl, generation, task):
+        if self.__pending.get(key, None) is task:
+            del self.__pending[key]
+        if task.cancelled() or task.exception() is not None or not ttl or generation != self.__generation:
+            return
+        now = time.monotonic()
+        for expired in [x for x, y in self.__entries.items() if y[0] <= now]:
+            del self.__entries[expired]
+        self.__entries[key] = (now + ttl, task.result())
+
+    def __copy(self, value):
+        # results are shared between callers, so each one gets its own copy and can change it
+        if isinstance(value, dict):
+            return {x: self.__copy(y) for x, y in value.items()}
+        if isinstance(value, list):
+            return [self.__copy(x) for x in value]
+        return value
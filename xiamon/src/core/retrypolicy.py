@@ -0,0 +1,77 @@
+import asyncio, random, time
+from .exceptions import ApiRequestFailedException, ApiTransientException, ApiNoAnswerException
+
+class Circuitbreaker:
+    failure_threshold = 5
+    reset_timeout = 30
+
+    __breakers = {}
+
+    def __init__(self):
+        self.__failures = 0
+        self.__opened = None
+
+    @classmethod
+    def get(cls, host):
+        breaker = cls.__breakers.get(host, None)
+        if breaker is None:
+            breaker = Circuitbreaker()
+            cls.__breakers[host] = breaker
+        return breaker
+
+    def allow(self):
+        if self.__opened is None:
+            return True
+        if time.monotonic() - self.__opened < self.reset_timeout:
+            return False
+        # half open: let one request through, the others keep failing fast until it is done
+        self.__opened = time.monotonic()
+        return True
+
+    def success(self):
+        self.__failures = 0
+        self.__opened = None
+
+    def failure(self):
+        self.__failures += 1
+        if self.__failures >= self.failure_threshold:
+            self.__opened = time.monotonic()
+
+class Retrypolicy:
+    def __init__(self, attempts=3, base_delay=1.0, max_delay=30.0, deadline=120.0):
+        self.__attempts = attempts
+        self.__base_delay = base_delay
+        self.__max_delay = max_delay
+        self.__deadline = deadline
+
+    async def run(self, host, request, log, idempotent=True):
+        breaker = Circuitbreaker.get(host)
+        deadline = time.monotonic() + self.__deadline
+        attempt = 1
+        while True:
+            if not breaker.allow():
+                log(f'{host} is not reachable, request skipped.')
+                raise ApiRequestFailedException(f'{host} is not reachable')
+            try:
+                result = await asyncio.wait_for(request(), max(0.0, deadline - time.monotonic()))
+            except (ApiTransientException, asyncio.TimeoutError) as e:
+                breaker.failure()
+                delay = random.uniform(0.0, min(self.__max_delay, self.__base_delay * 2 ** attempt))
+                # a timed out request might have been processed already, so only idempotent ones are repeated
+                timed_out = isinstance(e, asyncio.TimeoutError) and not idempotent
+                if timed_out or attempt >= self.__attempts or time.monotonic() + delay >= deadline:
+                    raise ApiRequestFailedException(str(e) or 'timeout') from e
+                log(f'Request to {host} failed, retry {attempt} of {self.__attempts - 1} in {delay:.1f} s.')
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except ApiNoAnswerException:
+                # the request was sent but not answered, it must not be repeated
+                breaker.failure()
+                raise
+            except ApiRequestFailedException:
+                # the backend answered, so it is alive
+                breaker.success()
+                raise
+            breaker.success()
+            return result
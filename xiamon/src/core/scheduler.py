@@ -1,78 +1,256 @@
-import croniter, datetime, traceback
-from collections import namedtuple
+import asyncio, croniter, datetime, heapq, itertools, traceback
+from collections import namedtuple, defaultdict
+from .config import Config
 from .interface import Interface
+from .jobstatistics import Jobstatistics
+from .otherdefaultdict import otherdefaultdict
+from .tablerenderer import Tablerenderer
 
-Startupjob = namedtuple("Startupjob", "name func")
+Startupjob = namedtuple("Startupjob", "name owner func")
 
 class Scheduler:
     class __bundle:
         def __init__(self, name, func, interval):
             self.name = name
+            self.owner = name.rsplit('-', 1)[0]
             self.cron = interval
             self.func = func
             self.iter = croniter.croniter(interval, datetime.datetime.now())
             self.next = self.iter.get_next(datetime.datetime)
+            self.previous = croniter.croniter(interval, self.next).get_prev(datetime.datetime)
+            self.interval = self.next - self.previous
+            self.task = None
 
-    def __init__(self):
+        def advance(self):
+            self.previous = self.next
+            self.next = self.iter.get_next(datetime.datetime)
+            self.interval = self.next - self.previous
+
+        def skip(self, time):
+            # continue with the first execution after the given time, previous stays the last real execution
+            self.iter = croniter.croniter(self.cron, time)
+            self.next = self.iter.get_next(datetime.datetime)
+            self.interval = self.next - croniter.croniter(self.cron, self.next).get_prev(datetime.datetime)
+
+        def coalesce(self, time):
+            # merge all missed executions into the latest one before the given time
+            self.iter = croniter.croniter(self.cron, time)
+            self.next = self.iter.get_prev(datetime.datetime)
+            self.interval = self.next - croniter.croniter(self.cron, self.next).get_prev(datetime.datetime)
+
+    def __init__(self, config=None):
+        self.__config = config if config is not None else Config({})
         self.__jobs = {}
+        self.__queue = []
+        self.__sequence = itertools.count()
         self.__startup_jobs = []
         self.__interfaces = []
+        self.__wakeup = asyncio.Event()
+
+        self.__default_timeout = self.__config.get(3600, 'job_timeout')
+        self.__watchdog_share = self.__config.get(0.5, 'watchdog_share')
+        self.__misfire_policy = self.__config.get('coalesce', 'misfire_policy')
+        self.__misfire_grace = self.__config.get(60, 'misfire_grace')
+        self.__overruns = defaultdict(lambda: 0)
+        self.__statistics = defaultdict(Jobstatistics)
+
+        self.__limit = asyncio.Semaphore(self.__config.get(8, 'max_parallel_jobs'))
+        owner_limit = self.__config.get(1, 'max_parallel_jobs_per_plugin')
+        self.__owner_limits = otherdefaultdict(lambda owner: \
+            asyncio.Semaphore(self.__config.get(owner_limit, 'plugins', owner, 'max_parallel_jobs')))
+
+        self.add_job('scheduler-statistics', self.__send_statistics, self.__config.get('0 0 * * *', 'statistics_interval'))
 
     async def start(self, interfaces):
         self.__interfaces.extend(interfaces)
         for job in self.__jobs.values():
             self.__print(Interface.Channel.debug, f'Job {job.name}; next execution: {job.next}')
-        for startup_job in self.__startup_jobs:
-            self.__print(Interface.Channel.debug, f'Running startup job {startup_job.name}.')
-            await self.__try_run(startup_job)
+        await asyncio.gather(*(self.__run_startup_job(x) for x in self.__startup_jobs))
             
     def add_job(self, name, func, interval):
         if interval is not None:
-            self.__jobs[name] = Scheduler.__bundle(name, func, interval)
+            job = Scheduler.__bundle(name, func, interval)
+            self.__jobs[name] = job
+            self.__enqueue(job)
 
     def add_startup_job(self, name, func):
-        self.__startup_jobs.append(Startupjob(name, func))
+        self.__startup_jobs.append(Startupjob(name, name.rsplit('-', 1)[0], func))
 
     async def manual(self, job):
         if job in self.__jobs:
-            await self.__try_run(self.__jobs[job])
+            await self.__run_limited(self.__jobs[job])
+            self.__wakeup.set()
         else:
             self.__print(Interface.Channel.error, f'Job {job} not found.')
 
     def get_last_execution(self, job):
-        bundle = self.__jobs[job]
-        iter = croniter.croniter(bundle.cron, bundle.next)
-        return iter.get_prev(datetime.datetime)
+        return self.__jobs[job].previous
+
+    @property
+    def overruns(self):
+        return dict(self.__overruns)
+
+    def get_statistics(self, job=None):
+        if job is None:
+            return dict(self.__statistics)
+        return self.__statistics.get(job, None)
 
     def get_current_interval(self, job):
         bundle = self.__jobs[job]
         now = datetime.datetime.now()
+        if bundle.previous <= now < bundle.next:
+            return bundle.interval
         next_iter = croniter.croniter(bundle.cron, now)
         prev_iter = croniter.croniter(bundle.cron, now)
         return next_iter.get_next(datetime.datetime) - prev_iter.get_prev(datetime.datetime)
         
     async def run(self):
+        while True:
+            self.__wakeup.clear()
+            self.__dispatch_pending()
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), timeout=self.__get_sleep_time())
+            except asyncio.TimeoutError:
+                pass
+
+    def __enqueue(self, job):
+        heapq.heappush(self.__queue, (job.next, next(self.__sequence), job))
+        self.__wakeup.set()
+
+    def __peek(self):
+        # jobs replaced by add_job() leave stale entries, they are dropped lazily
+        while len(self.__queue) > 0:
+            _, _, job = self.__queue[0]
+            if self.__jobs.get(job.name) is job:
+                return job
+            heapq.heappop(self.__queue)
+        return None
+
+    def __dispatch_pending(self):
         time = datetime.datetime.now()
-        for job in self.__jobs.values():
-            diff = (job.next - time).total_seconds()
-            if diff < 0:
-                await self.__try_run(job)
-                job.next = job.iter.get_next(datetime.datetime)
+        while True:
+            job = self.__peek()
+            if job is None or job.next > time:
+                break
+            heapq.heappop(self.__queue)
+            if not self.__handle_misfire(job, time):
+                self.__enqueue(job)
+                continue
+            job.task = asyncio.ensure_future(self.__dispatch(job))
 
-        next_run = 3600
-        for job in self.__jobs.values():
-            diff = max(0, (job.next - time).total_seconds())
-            if diff < next_run:
-                next_run = diff
-        return round(next_run) + 1
+    def __handle_misfire(self, job, time):
+        grace = datetime.timedelta(seconds=self.__config.get(self.__misfire_grace, 'jobs', job.name, 'misfire_grace'))
+        if job.next >= time - grace:
+            return True
+        policy = self.__config.get(self.__misfire_policy, 'jobs', job.name, 'misfire_policy')
+        missed = job.next
+        if policy == 'skip':
+            job.skip(time - grace)
+            self.__print(Interface.Channel.debug, f'Job {job.name} missed its execution at {missed}, next execution: {job.next}')
+            return False
+        elif policy == 'coalesce':
+            job.coalesce(time)
+            if job.next != missed:
+                self.__print(Interface.Channel.debug, f'Job {job.name} missed its executions since {missed}, running once.')
+        return True
+
+    async def __run_startup_job(self, job):
+        self.__print(Interface.Channel.debug, f'Running startup job {job.name}.')
+        start = asyncio.get_event_loop().time()
+        await self.__run_limited(job)
+        self.__print(Interface.Channel.debug, f'Startup job {job.name} finished after {(asyncio.get_event_loop().time() - start):.1f} s.')
 
-    async def __try_run(self, job):
+    async def __dispatch(self, job):
         try:
-            await job.func()
+            await self.__run_limited(job, job.next)
+        finally:
+            # the next execution is updated after the run, so the job still sees
+            # its previous execution in get_last_execution() while running
+            job.advance()
+            job.task = None
+            if self.__jobs.get(job.name) is job:
+                self.__enqueue(job)
+
+    def __get_sleep_time(self):
+        job = self.__peek()
+        if job is None:
+            return 3600
+        return min(3600, max(0, (job.next - datetime.datetime.now()).total_seconds()))
+
+    async def __run_limited(self, job, scheduled=None):
+        # acquire the plugin limit first, so jobs waiting for their plugin do not block other plugins
+        async with self.__owner_limits[job.owner]:
+            async with self.__limit:
+                await self.__try_run(job, scheduled)
+
+    async def __try_run(self, job, scheduled=None):
+        loop = asyncio.get_event_loop()
+        timeout = self.__config.get(self.__default_timeout, 'jobs', job.name, 'timeout')
+        watchdog = self.__start_watchdog(job)
+        lag = (datetime.datetime.now() - scheduled).total_seconds() if scheduled is not None else None
+        start = loop.time()
+        exception = None
+        try:
+            await asyncio.wait_for(job.func(), timeout)
+        except asyncio.TimeoutError as e:
+            elapsed = loop.time() - start
+            if timeout is None or elapsed < timeout:
+                exception = type(e).__name__
+                self.__report_failure(job, e)
+            else:
+                exception = 'Timeout'
+                self.__print(Interface.Channel.error, f'Job {job.name} cancelled after {elapsed:.1f} s: timeout of {timeout} s exceeded.')
         except Exception as e:
-            trace = traceback.format_exc()
-            message = f'Job {job.name} failed:\n{repr(e)}\n{trace}'
-            self.__print(Interface.Channel.error, message)
+            exception = type(e).__name__
+            self.__report_failure(job, e)
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            self.__statistics[job.name].add(lag, loop.time() - start, exception)
+
+    def __report_failure(self, job, exception):
+        trace = traceback.format_exc()
+        message = f'Job {job.name} failed:\n{repr(exception)}\n{trace}'
+        self.__print(Interface.Channel.error, message)
+
+    def __start_watchdog(self, job):
+        if self.__watchdog_share is None or not isinstance(job, Scheduler.__bundle):
+            return None
+        interval = job.interval.total_seconds()
+        limit = interval * self.__watchdog_share
+        return asyncio.get_event_loop().call_later(limit, self.__watchdog_triggered, job, limit, interval)
+
+    def __watchdog_triggered(self, job, elapsed, interval):
+        self.__overruns[job.name] += 1
+        self.__print(Interface.Channel.debug,
+            f'Job {job.name} is still running after {elapsed:.0f} s ({(100 * elapsed / interval):.0f} % of its interval).')
+
+    async def __send_statistics(self):
+        summary = Tablerenderer(['Job', 'Runs', 'Failed', 'Lag avg', 'Lag max', 'Duration avg', 'Duration max'])
+        labels = [f'<{self.__format_seconds(x)}' for x in Jobstatistics.buckets]
+        labels.append(f'>{self.__format_seconds(Jobstatistics.buckets[-1])}')
+        durations = Tablerenderer(['Job'] + labels)
+        for name, statistics in sorted(self.__statistics.items()):
+            lag = statistics.lag
+            duration = statistics.duration
+            summary.add_row((name, statistics.runs, statistics.failures,
+                self.__format_seconds(lag.mean), self.__format_seconds(lag.maximum),
+                self.__format_seconds(duration.mean), self.__format_seconds(duration.maximum)))
+            durations.add_row([name] + duration.counts)
+            if len(statistics.exceptions) > 0:
+                summary.add_row(('', '', ', '.join(f'{x}: {y}' for x, y in statistics.exceptions.items())))
+        self.__print(Interface.Channel.debug, f'Job statistics since startup:\n{summary.render()}')
+        self.__print(Interface.Channel.debug, f'Job durations:\n{durations.render()}')
+
+    @staticmethod
+    def __format_seconds(seconds):
+        if seconds is None:
+            return ''
+        if seconds < 60:
+            return f'{seconds:.1f} s' if seconds < 10 and seconds != int(seconds) else f'{seconds:.0f} s'
+        if seconds < 3600:
+            return f'{(seconds / 60):.0f} m'
+        return f'{(seconds / 3600):.0f} h'
 
     def __print(self, channel, message):
         for interface in self.__interfaces:
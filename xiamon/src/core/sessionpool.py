@@ -0,0 +1,39 @@
+class Sessionpool:
+    limit_per_host = 4
+    dns_cache_ttl = 300
+    keepalive_timeout = 60
+
+    __sessions = {}
+
+    @classmethod
+    def session(cls, host, auth=None, headers=None):
+        key = (host, auth, tuple(sorted(headers.items())) if headers is not None else None)
+        session = cls.__sessions.get(key, None)
+        if session is None or session.closed:
+            # imported on first use, so setups without http based plugins do not load aiohttp
+            import aiohttp
+            connector = aiohttp.TCPConnector(
+                limit_per_host=cls.limit_per_host,
+                ttl_dns_cache=cls.dns_cache_ttl,
+                keepalive_timeout=cls.keepalive_timeout)
+            session = aiohttp.ClientSession(connector=connector, auth=auth, headers=headers)
+            cls.__sessions[key] = session
+        return Sessionpool.Lease(session)
+
+    @classmethod
+    async def close(cls):
+        sessions = list(cls.__sessions.values())
+        cls.__sessions.clear()
+        for session in sessions:
+            await session.close()
+
+    class Lease:
+        # the pool owns the session, so leaving the context must not close it
+        def __init__(self, session):
+            self.__session = session
+
+        async def __aenter__(self):
+            return self.__session
+
+        async def __aexit__(self, exc_type, exc_value, tb):
+            pass
@@ -1,49 +1,78 @@
 import aiohttp
 from .plugin import Plugin
-from .exceptions import ApiRequestFailedException
+from .exceptions import ApiRequestFailedException, ApiTransientException
+from .postrequest import post_request
+from .jsonstream import Jsonstream
+from .responsecache import Responsecache
+from .retrypolicy import Retrypolicy
+from .sessionpool import Sessionpool
 
 class Siaapi:
-    def __init__(self, host, password, plugin):
+    def __init__(self, host, password, plugin, cache=None):
         self.__host = host
         self.__password = password
         self.__plugin = plugin
+        self.__cache = cache if cache is not None else Responsecache()
+        self.__retry = Retrypolicy()
 
     def create_session(self):
         headers = {'User-Agent': 'Sia-Agent'}
         auth = aiohttp.BasicAuth("", self.__password) if self.__password is not None else None
-        session = aiohttp.ClientSession(headers=headers, auth=auth)
-        return session
+        return Sessionpool.session(self.__host, auth=auth, headers=headers)
 
-    async def get(self, session, cmd, input = {}):
+    async def get(self, session, cmd, input = {}, cached = True):
+        parameters = []
+        for key, value in input.items():
+            parameters.append(f'{key}={value}')
+        payload = '?'+'&'.join(parameters) if len(parameters) > 0 else ''
+        request = lambda: self.__retry.run(self.__host, lambda: self.__get(session, cmd, payload), self.__plugin.msg.debug)
+        if not cached:
+            return await request()
+        return await self.__cache.get(cmd, f'{cmd}{payload}', request)
+
+    async def __get(self, session, cmd, payload):
         try:
-            parameters = []
-            for key, value in input.items():
-                parameters.append(f'{key}={value}')
-            payload = '?'+'&'.join(parameters) if len(parameters) > 0 else ''
             async with session.get(f'http://{self.__host}/{cmd}{payload}') as response:
                 json = await response.json()
                 status = response.status
         except Exception as e:
             self.__plugin.msg.debug(f'Command {cmd} failed: {str(e)}')
-            raise ApiRequestFailedException()
+            raise ApiTransientException()
         if not (status >= 200 and status <= 299):
             self.__plugin.msg.debug(f'Command {cmd} returned status {status}.')
-            raise ApiRequestFailedException()
+            raise ApiTransientException() if status >= 500 or status == 429 else ApiRequestFailedException()
         return json
 
-    async def post(self, session, cmd, input):
+    async def get_array(self, session, cmd, key, fields=None, minimum=None):
+        # parses the array under key while receiving it, keeping only the given fields
+        # of the items whose values are at least the values given in minimum
+        cache_key = f'{cmd}[{key}]{fields}{sorted(minimum.items()) if minimum is not None else None}'
+        return await self.__cache.get(cmd, cache_key,
+            lambda: self.__retry.run(self.__host, lambda: self.__get_array(session, cmd, key, fields, minimum), self.__plugin.msg.debug))
+
+    async def __get_array(self, session, cmd, key, fields, minimum):
+        items = []
         try:
-            parameters = []
-            for key, value in input.items():
-                parameters.append(f'{key}={value}')
-            payload = '&'.join(parameters)
-            async with session.post(f'http://{self.__host}/{cmd}?{payload}') as response:
-                _ = await response.text()
+            async with session.get(f'http://{self.__host}/{cmd}') as response:
                 status = response.status
+                if status >= 200 and status <= 299:
+                    async for item in Jsonstream(key).items(response.content):
+                        if minimum is not None and any(int(item[x]) < y for x, y in minimum.items()):
+                            continue
+                        items.append(item if fields is None else {x: item[x] for x in fields})
         except Exception as e:
             self.__plugin.msg.debug(f'Command {cmd} failed: {str(e)}')
-            raise ApiRequestFailedException()
+            raise ApiTransientException()
         if not (status >= 200 and status <= 299):
             self.__plugin.msg.debug(f'Command {cmd} returned status {status}.')
-            raise ApiRequestFailedException()
+            raise ApiTransientException() if status >= 500 or status == 429 else ApiRequestFailedException()
+        return {key: items}
+
+    async def post(self, session, cmd, input):
+        try:
+            await self.__retry.run(self.__host, lambda: post_request(session, f'http://{self.__host}/{cmd}', cmd, input, self.__plugin.msg.debug),
+                self.__plugin.msg.debug, idempotent=False)
+        finally:
+            # also after a failure, the request might have been applied
+            self.__cache.invalidate()
 
@@ -1,4 +1,5 @@
-import ciso8601
+import bisect, ciso8601
+from array import array
 from datetime import datetime
 from .conversions import Conversions
 
@@ -197,61 +198,136 @@ class Siatrafficdata:
         return self.__upload
 
 class Siacontractsdata:
-    def __init__(self, json):
-        self.__contracts = []
-        for json_contract in json['contracts']:
-            self.__contracts.append(Siacontractsdata.Contract(json_contract))
+    # the only fields of host/contracts read by this class
+    fields = ('obligationid', 'datasize', 'lockedcollateral', 'riskedcollateral', 'potentialstoragerevenue', 'potentialuploadrevenue',
+        'potentialdownloadrevenue', 'potentialaccountfunding', 'negotiationheight', 'proofdeadline', 'obligationstatus')
+
+    columns = ('datasize', 'locked_collateral', 'risked_collateral', 'storage_revenue', 'io_revenue', 'ephemeral_revenue')
+
+    def __init__(self, json=None):
+        # one typed array per field, sorted by proof deadline, so height windows are found by bisection
+        self.__id = []
+        self.__status = []
+        self.__start = array('q')
+        self.__end = array('q')
+        self.__proof_success = array('b')
+        self.__columns = {
+            'datasize': array('q'),
+            'locked_collateral': array('d'),
+            'risked_collateral': array('d'),
+            'storage_revenue': array('d'),
+            'io_revenue': array('d'),
+            'ephemeral_revenue': array('d')
+        }
+        if json is None:
+            return
+        rows = sorted(json['contracts'], key=lambda x: int(x['proofdeadline']))
+        self.__id.extend(x['obligationid'] for x in rows)
+        self.__status.extend(x['obligationstatus'] for x in rows)
+        self.__start.extend(int(x['negotiationheight']) for x in rows)
+        self.__end.extend(int(x['proofdeadline']) for x in rows)
+        self.__proof_success.extend(x['obligationstatus'] == 'obligationSucceeded' for x in rows)
+        self.__columns['datasize'].extend(int(x['datasize']) for x in rows)
+        self.__columns['locked_collateral'].extend(Conversions.hasting_to_siacoin(int(x['lockedcollateral'])) for x in rows)
+        self.__columns['risked_collateral'].extend(Conversions.hasting_to_siacoin(int(x['riskedcollateral'])) for x in rows)
+        self.__columns['storage_revenue'].extend(Conversions.hasting_to_siacoin(int(x['potentialstoragerevenue'])) for x in rows)
+        self.__columns['io_revenue'].extend(
+            Conversions.hasting_to_siacoin(int(x['potentialuploadrevenue'])) +
+            Conversions.hasting_to_siacoin(int(x['potentialdownloadrevenue'])) for x in rows)
+        self.__columns['ephemeral_revenue'].extend(Conversions.hasting_to_siacoin(int(x['potentialaccountfunding'])) for x in rows)
+
+    def __len__(self):
+        return len(self.__end)
 
     @property
     def contracts(self):
-       return self.__contracts 
+        return [Siacontractsdata.Contract(self, i) for i in range(len(self.__end))]
+
+    @property
+    def id(self):
+        return self.__id
+
+    @property
+    def status(self):
+        return self.__status
+
+    @property
+    def start(self):
+        return self.__start
+
+    @property
+    def end(self):
+        return self.__end
+
+    @property
+    def proof_success(self):
+        return self.__proof_success
+
+    def column(self, name):
+        return self.__columns[name]
+
+    def sum(self, *names):
+        return sum(sum(self.__columns[x]) for x in names)
+
+    def ending(self, begin=None, end=None):
+        # contracts with begin <= proof deadline < end
+        lower = bisect.bisect_left(self.__end, begin) if begin is not None else 0
+        upper = bisect.bisect_left(self.__end, end) if end is not None else len(self.__end)
+        return self.__subset(lambda x: x[lower:upper])
+
+    def __subset(self, selector):
+        subset = Siacontractsdata()
+        subset.__id = selector(self.__id)
+        subset.__status = selector(self.__status)
+        subset.__start = selector(self.__start)
+        subset.__end = selector(self.__end)
+        subset.__proof_success = selector(self.__proof_success)
+        subset.__columns = {x: selector(y) for x, y in self.__columns.items()}
+        return subset
 
     class Contract:
+        __slots__ = ('__data', '__index')
 
-        def __init__(self, json):
-            self.__datasize = int(json['datasize'])
-            self.__locked_collateral = Conversions.hasting_to_siacoin(int(json['lockedcollateral']))
-            self.__risked_collateral = Conversions.hasting_to_siacoin(int(json['riskedcollateral']))
-            self.__storage_revenue = Conversions.hasting_to_siacoin(int(json['potentialstoragerevenue']))
-            self.__io_revenue = Conversions.hasting_to_siacoin(int(json['potentialuploadrevenue'])) + \
-                Conversions.hasting_to_siacoin(int(json['potentialdownloadrevenue']))
-            self.__ephemeral_revenue = Conversions.hasting_to_siacoin(int(json['potentialaccountfunding']))
-            self.__start = int(json['negotiationheight'])
-            self.__end = int(json['proofdeadline'])
-            self.__proof_success = json['obligationstatus'] == 'obligationSucceeded'
+        def __init__(self, data, index):
+            self.__data = data
+            self.__index = index
+
+        @property
+        def id(self):
+            return self.__data.id[self.__index]
 
         @property
         def datasize(self):
-            return self.__datasize
+            return self.__data.column('datasize')[self.__index]
 
         @property
         def locked_collateral(self):
-            return self.__locked_collateral
+            return self.__data.column('locked_collateral')[self.__index]
 
         @property
         def risked_collateral(self):
-            return self.__risked_collateral
+            return self.__data.column('risked_collateral')[self.__index]
 
         @property
         def storage_revenue(self):
-            return self.__storage_revenue
+            return self.__data.column('storage_revenue')[self.__index]
 
         @property
         def io_revenue(self):
-            return self.__io_revenue
+            return self.__data.column('io_revenue')[self.__index]
 
         @property
         def ephemeral_revenue(self):
-            return self.__ephemeral_revenue
+            return self.__data.column('ephemeral_revenue')[self.__index]
 
         @property
         def start(self):
-            return self.__start
+            return self.__data.start[self.__index]
 
         @property
         def end(self):
-            return self.__end
+            return self.__data.end[self.__index]
 
         @property
         def proof_success(self):
-            return self.__proof_success
+            return bool(self.__data.proof_success[self.__index])
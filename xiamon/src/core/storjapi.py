@@ -1,26 +1,32 @@
-import aiohttp
 from .plugin import Plugin
-from .exceptions import ApiRequestFailedException
+from .exceptions import ApiRequestFailedException, ApiTransientException
+from .responsecache import Responsecache
+from .retrypolicy import Retrypolicy
+from .sessionpool import Sessionpool
 
 class Storjapi:
-    def __init__(self, host, plugin):
+    def __init__(self, host, plugin, cache=None):
         self.__host = host
         self.__plugin = plugin
+        self.__cache = cache if cache is not None else Responsecache()
+        self.__retry = Retrypolicy()
 
-    @staticmethod
-    def create_session():
-        session = aiohttp.ClientSession()
-        return session
+    def create_session(self):
+        return Sessionpool.session(self.__host)
 
     async def get(self, session, cmd):
+        return await self.__cache.get(cmd, cmd,
+            lambda: self.__retry.run(self.__host, lambda: self.__get(session, cmd), self.__plugin.msg.debug))
+
+    async def __get(self, session, cmd):
         try:
             async with session.get(f'http://{self.__host}/api/{cmd}') as response:
                 json = await response.json()
                 status = response.status
         except Exception as e:
             self.__plugin.msg.debug(f'Command {cmd} failed: {str(e)}')
-            raise ApiRequestFailedException()
+            raise ApiTransientException()
         if not (status >= 200 and status <= 299):
             self.__plugin.msg.debug(f'Command {cmd} returned status {status}.')
-            raise ApiRequestFailedException()
+            raise ApiTransientException() if status >= 500 or status == 429 else ApiRequestFailedException()
         return json
@@ -1,3 +1,6 @@
-from .discordbot import *
-from .logfile import *
-from .stdout import *
\ No newline at end of file
+from ..core.registry import Registry
+
+available_interfaces = Registry(__name__, {
+    'discordbot': 'discordbot.Discordbot',
+    'logfile': 'logfile.Logfile',
+    'stdout': 'stdout.Stdout'})
@@ -1,7 +1,6 @@
 import os, discord, asyncio
 from discord.ext import tasks
 from queue import Queue
-from time import sleep
 from threading import Thread
 from ...core.interface import Interface
 from ...core import Config
@@ -23,7 +22,7 @@ class Discordbot(Interface):
     async def start(self):
         self.__worker.start()
         while not self.__worker.bot.ready:
-            sleep(1)
+            await asyncio.sleep(1)
         
         channels = ','.join(self.channel_names[x] for x in self.__worker.bot.channels)
         print(f'[discordbot] Discord bot {self.__worker.bot.user} ready, available channels: {channels}')
@@ -1,17 +1,20 @@
-from .chiafarmer import *
-from .chiaharvester import *
-from .chianode import *
-from .chiawallet import *
-from .diskfree import *
-from .eccram import *
-from .hostd import *
-from .messagerelay import *
-from .mqttlogger import *
-from .opendtu import *
-from .pingdrive import *
-from .serviceping import *
-from .siahost import *
-from .smartctl import *
-from .spacefarmers import *
-from .storjnode import *
-from .sysmonitor import *
\ No newline at end of file
+from ..core.registry import Registry
+
+available_plugins = Registry(__name__, {
+    'chiaharvester': 'chiaharvester.Chiaharvester',
+    'chiafarmer': 'chiafarmer.Chiafarmer',
+    'chianode': 'chianode.Chianode',
+    'chiawallet': 'chiawallet.Chiawallet',
+    'diskfree': 'diskfree.Diskfree',
+    'eccram': 'eccram.Eccram',
+    'hostd': 'hostd.Hostd',
+    'messagerelay': 'messagerelay.Messagerelay',
+    'mqttlogger': 'mqttlogger.Mqttlogger',
+    'opendtu': 'opendtu.Opendtu',
+    'pingdrive': 'pingdrive.Pingdrive',
+    'serviceping': 'serviceping.Serviceping',
+    'siahost': 'siahost.Siahost',
+    'smartctl': 'smartctl.Smartctl',
+    'spacefarmers': 'spacefarmers.Spacefarmers',
+    'storjnode': 'storjnode.Storjnode',
+    'sysmonitor': 'sysmonitor.Sysmonitor'})
@@ -1,5 +1,4 @@
 from datetime import timedelta
-import aiohttp
 from ...core import Plugin, Chiarpc, ApiRequestFailedException
 from .challengecache import ChallengeCache
 
@@ -16,7 +15,8 @@ class Chiafarmer(Plugin):
             self.config.get('127.0.0.1:8559','host'),
             self.config.data['cert'],
             self.config.data['key'],
-            super(Chiafarmer, self))
+            super(Chiafarmer, self),
+            self.response_cache())
 
         self.__threshold_short = float(self.config.get(0.95, 'underharvested_threshold_short'))
         self.__threshold_long = float(self.config.get(0.99, 'underharvested_threshold_long'))
@@ -29,7 +29,7 @@ class Chiafarmer(Plugin):
         self.__interval = self.__scheduler.get_current_interval(self.__summary_job)
 
     async def check(self):
-        async with aiohttp.ClientSession() as session:
+        async with self.__farmer_rpc.create_session() as session:
             await self.__get_signage_points(session)
 
     async def evaluate(self):
@@ -1,4 +1,3 @@
-import aiohttp
 from ...core import Plugin, Chiarpc, ApiRequestFailedException
 
 class Chiaharvester(Plugin):
@@ -11,7 +10,8 @@ class Chiaharvester(Plugin):
             self.config.get('127.0.0.1:8560', 'host'),
             self.config.data['cert'],
             self.config.data['key'],
-            super(Chiaharvester, self))
+            super(Chiaharvester, self),
+            self.response_cache())
 
         self.__failed_plots = set()
         self.__not_found_plots = set()
@@ -19,7 +19,7 @@ class Chiaharvester(Plugin):
         scheduler.add_job(self.__check_job ,self.check, self.config.get('*/5 * * * *', 'interval'))
 
     async def check(self):
-        async with aiohttp.ClientSession() as session:
+        async with self.__rpc.create_session() as session:
             failed, not_found = await self.__get_plots(session)
         if None in (failed, not_found):
             return
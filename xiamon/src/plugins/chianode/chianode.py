@@ -1,4 +1,3 @@
-import aiohttp
 from ...core import Plugin, Chiarpc
 from .nodeconnections import Nodeconnections
 from .nodesyncstate import NodeSyncState
@@ -8,13 +7,13 @@ class Chianode(Plugin):
         super(Chianode, self).__init__(config, outputs)
         
         host = self.config.get('127.0.0.1:8555', 'host')
-        self.__rpc = Chiarpc(host, self.config.data['cert'], self.config.data['key'], super(Chianode, self))
+        self.__rpc = Chiarpc(host, self.config.data['cert'], self.config.data['key'], super(Chianode, self), self.response_cache())
 
         scheduler.add_job(f'{self.name}-check' ,self.check, self.config.get('0 * * * *', 'check_interval'))
         scheduler.add_job(f'{self.name}-summary', self.summary, self.config.get('0 0 * * *', 'summary_interval'))
 
     async def check(self):
-        async with aiohttp.ClientSession() as session:
+        async with self.__rpc.create_session() as session:
             state = await NodeSyncState.create(self.__rpc, session)
             if not state.available or (not state.synced and state.height is None):
                 self.alert('unsynced', 'Full node stalled.', 'stalled')
@@ -24,7 +23,7 @@ class Chianode(Plugin):
                 self.alert('unsynced', f'Full node NOT synced; {state.height}/{state.peak}.', 'syncing')
 
     async def summary(self):
-        async with aiohttp.ClientSession() as session:
+        async with self.__rpc.create_session() as session:
             state = await NodeSyncState.create(self.__rpc, session)
             connections = await Nodeconnections.create(self.__rpc, session, state.peak)
         if state.available:
@@ -1,4 +1,3 @@
-import aiohttp
 from ...core import Plugin, Chiarpc, Coinprice, ApiRequestFailedException, Conversions, CsvExporter
 from .chiawalletdb import Chiawalletdb
 
@@ -7,12 +6,12 @@ class Chiawallet(Plugin):
         super(Chiawallet, self).__init__(config, outputs)
 
         host = self.config.get('127.0.0.1:9256', 'host')
-        self.__rpc = Chiarpc(host, self.config.data['cert'], self.config.data['key'], super(Chiawallet, self))
+        self.__rpc = Chiarpc(host, self.config.data['cert'], self.config.data['key'], super(Chiawallet, self), self.response_cache())
         self.__wallet_id = self.config.get(1, 'wallet_id')
 
         self.__db = Chiawalletdb(self.config.data['database'])
         self.__csv = CsvExporter(self.config.get(None, 'csv_export'))
-        self.__coinprice = Coinprice('chia', self.config.get('usd', 'currency'))
+        self.__coinprice = Coinprice('chia', self.config.get('usd', 'currency'), self.__db.get_latest_price, self.msg.debug)
 
         scheduler.add_job(f'{self.name}-check' ,self.check, self.config.get('0 * * * *', 'check_interval'))
         scheduler.add_job(f'{self.name}-summary', self.summary, self.config.get('0 0 * * *', 'summary_interval'))
@@ -26,7 +25,7 @@ class Chiawallet(Plugin):
         await self.check()
 
     async def check(self):
-        async with aiohttp.ClientSession() as session:
+        async with self.__rpc.create_session() as session:
             balance = await self.__get_balance(session)
             if balance is None:
                 return
@@ -37,7 +36,8 @@ class Chiawallet(Plugin):
             if diff == 0:
                 return
             await self.__coinprice.update()
-            self.__db.update_balance(balance, self.__coinprice.price)
+            # a fallback price comes from the database, storing it again would keep it from expiring
+            self.__db.update_balance(balance, self.__coinprice.price if self.__coinprice.fresh else None)
             self.__csv.add_line({
                 'Delta (XCH)': diff,
                 f'Delta ({self.__coinprice.currency})': self.__coinprice.to_fiat(diff),
@@ -59,7 +59,7 @@ class Chiawallet(Plugin):
         else:
             price_message = f'Coin price: {self.__coinprice.to_fiat_string(1)}/XCH'
 
-        async with aiohttp.ClientSession() as session:
+        async with self.__rpc.create_session() as session:
             balance = await self.__get_balance(session)
             if balance is None:
                 message = f'Balance unknown, wallet is unavailable.\n{price_message}'
@@ -1,54 +1,50 @@
-import sqlite3
-from pathlib import Path
 from datetime import datetime
 
-from ...core import Conversions
+from ...core import Conversions, Database
 
 class Chiawalletdb():
+    __migrations = [
+        [
+            """CREATE INDEX IF NOT EXISTS balance_timestamp ON balance(timestamp);"""
+        ]
+    ]
+
     def __init__(self, file):
-        self.__path = Path(file)
-        if not self.__path.parent.exists():
-            raise FileNotFoundError(f'Path contains not existing directory: {file}')
-        self.__db = sqlite3.connect(self.__path)
-        self.__create_table()
+        self.__db = Database(file, [self.__create_table()], self.__migrations)
         self.__balance = self.__get_balance()
 
     def __del__(self):
         self.__db.close()
 
     def update_balance(self, balance, price):
-        self.__add_row(datetime.now(), balance, price)
+        self.__db.insert_sample('balance', balance=Conversions.xch_to_mojo(balance), price=price)
         self.__balance = balance
 
     @property
     def balance(self):
         return self.__balance;
 
-    def __create_table(self):
-        command = """CREATE TABLE IF NOT EXISTS balance (
+    def get_latest_price(self):
+        command = """SELECT timestamp, price FROM balance WHERE price IS NOT NULL ORDER BY timestamp DESC LIMIT 1;"""
+
+        rows = self.__db.query(command)
+        if rows is None:
+            return None, None
+        return datetime.fromtimestamp(rows[0][0]), rows[0][1]
+
+    @staticmethod
+    def __create_table():
+        return """CREATE TABLE IF NOT EXISTS balance (
                         id integer PRIMARY KEY,
                         timestamp integer NOT NULL,
                         balance int NOT NULL,
                         price real
                     );"""
 
-        self.__db.cursor().execute(command)
-
-    def __add_row(self, timestamp, balance, price):
-        command = """INSERT INTO balance(timestamp, balance, price)
-                        VALUES(?,?,?)"""
-        data = (int(timestamp.timestamp()), Conversions.xch_to_mojo(balance), price)
-
-        self.__db.cursor().execute(command, data)
-        self.__db.commit()
-
     def __get_balance(self):
         command = """SELECT balance FROM balance ORDER BY timestamp DESC LIMIT 1;"""
 
-        cursor = self.__db.cursor()
-        cursor.execute(command)
-        rows = cursor.fetchall()
-
-        if len(rows) == 0:
+        rows = self.__db.query(command)
+        if rows is None:
             return None
         return Conversions.mojo_to_xch(rows[0][0])
\ No newline at end of file
@@ -1,4 +1,4 @@
-from ...core import Plugin, Hostdapi, CsvExporter, Coinprice, ApiRequestFailedException
+from ...core import Plugin, Hostdapi, CsvExporter, Coinprice, ApiRequestFailedException, request_all
 from ...core import Hostdconsensusdata, Hostdwalletdata, Hostdmetricsdata
 from .hostddb import Hostddb
 from .hostdhealth import Hostdhealth
@@ -20,11 +20,11 @@ class Hostd(Plugin):
 
         host = self.config.get('127.0.0.1:9980','host')
         password = self.config.data['password']
-        self.__api = Hostdapi(host, password, self)
+        self.__api = Hostdapi(host, password, self, self.response_cache())
 
         self.__db = Hostddb(self.config.data['database'])
         self.__csv = CsvExporter(self.config.get(None, 'csv_export'))
-        self.__coinprice = Coinprice('siacoin', self.config.data['currency'])
+        self.__coinprice = Coinprice('siacoin', self.config.data['currency'], self.__db.get_latest_coinprice, self.msg.debug)
 
         self.__health = Hostdhealth(self, self.config)
         self.__storage = Hostdstorage(self)
@@ -43,8 +43,9 @@ class Hostd(Plugin):
     async def check(self):
         with self.message_aggregator():
             try:
-                consensus = await self.__request('state/consensus', lambda x: Hostdconsensusdata(x))
-                wallet = await self.__request('wallet', lambda x: Hostdwalletdata(x))
+                consensus, wallet = await request_all(
+                    self.__request('state/consensus', lambda x: Hostdconsensusdata(x)),
+                    self.__request('wallet', lambda x: Hostdwalletdata(x)))
             except ApiRequestFailedException:
                 self.msg.debug('Check failed: some host queries failed.')
                 return
@@ -55,10 +56,11 @@ class Hostd(Plugin):
         with self.message_aggregator():
             last_execution = self.__scheduler.get_last_execution(self.__summary_job)
             try:
-                consensus = await self.__request('state/consensus', lambda x: Hostdconsensusdata(x))
-                wallet = await self.__request('wallet', lambda x: Hostdwalletdata(x))
-                metrics = await self.__request('metrics', lambda x: Hostdmetricsdata(x))
-                last_metrics = await self.__request('metrics', lambda x: Hostdmetricsdata(x), payload={'timestamp': self.__get_iso_date_time(last_execution)})
+                consensus, wallet, metrics, last_metrics = await request_all(
+                    self.__request('state/consensus', lambda x: Hostdconsensusdata(x)),
+                    self.__request('wallet', lambda x: Hostdwalletdata(x)),
+                    self.__request('metrics', lambda x: Hostdmetricsdata(x)),
+                    self.__request('metrics', lambda x: Hostdmetricsdata(x), {'timestamp': self.__get_iso_date_time(last_execution)}))
             except ApiRequestFailedException:
                 self.msg.info('No summary created, host is not available.')
                 return
@@ -72,8 +74,9 @@ class Hostd(Plugin):
     async def list(self):
         with self.message_aggregator():
             try:
-                wallet = await self.__request('wallet', lambda x: Hostdwalletdata(x))
-                metrics = await self.__request('metrics', lambda x: Hostdmetricsdata(x))
+                wallet, metrics = await request_all(
+                    self.__request('wallet', lambda x: Hostdwalletdata(x)),
+                    self.__request('metrics', lambda x: Hostdmetricsdata(x)))
             except ApiRequestFailedException:
                 self.msg.error('Report failed: some host queries failed.')
                 return
@@ -93,13 +96,15 @@ class Hostd(Plugin):
     async def daychange(self):
         pass
 
-    async def __update_coinprice(self, error_channel, error_message):
-        if not await self.__coinprice.update():
+    async def __update_coinprice(self, error_channel, error_message, allow_fallback=True):
+        if not await self.__coinprice.update() or not (allow_fallback or self.__coinprice.fresh):
             self.msg[error_channel](error_message)
             return False
-        else:
+        if self.__coinprice.fresh:
             self.__db.update_coinprice(self.__coinprice.price)
-            return True
+        else:
+            self.msg.debug(f'Coin price not available, using last known price of {self.__coinprice.price} {self.__coinprice.currency}.')
+        return True
         
     def __get_iso_date_time(self, timestamp):
         tz_dt = timestamp.astimezone()
@@ -1,7 +1,7 @@
-import sqlite3
-from pathlib import Path
 from datetime import datetime, timedelta
 
+from ...core import Database
+
 class Hostddb():
     __tables = [
         """CREATE TABLE IF NOT EXISTS coinprice (
@@ -29,110 +29,71 @@ class Hostddb():
             timestamp integer NOT NULL
         );"""
     ]
+    __migrations = [
+        [
+            """CREATE INDEX IF NOT EXISTS coinprice_timestamp ON coinprice(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS balance_timestamp ON balance(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS contracts_timestamp ON contracts(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS blocks_timestamp ON blocks(timestamp);"""
+        ]
+    ]
     __inserters = {
-        'coinprice' : """INSERT INTO coinprice(timestamp, price)
-                        VALUES(?,?)""",
-        'balance' : """INSERT INTO balance(timestamp, free, locked, risked)
-                        VALUES(?,?,?,?)""",
-        'contracts' : """INSERT INTO contracts(timestamp, count, storage, io, ephemeral)
-                        VALUES(?,?,?,?,?)""",
         'blocks' : """INSERT OR IGNORE INTO blocks(height, timestamp)
                         VALUES(?,?)"""
     }
 
-    def __init__(self, file):
-        self.__path = Path(file)
-        if not self.__path.parent.exists():
-            raise FileNotFoundError(f'Path contains not existing directory: {file}')
-        self.__db = sqlite3.connect(self.__path)
-        cursor = self.__db.cursor()
-        for cmd in self.__tables:
-            cursor.execute(cmd)
+    def __init__(self, file, max_distance=timedelta(minutes=30)):
+        self.__db = Database(file, self.__tables, self.__migrations)
+        self.__max_distance = max_distance
 
     def __del__(self):
         self.__db.close()
 
     def update_coinprice(self, price):
-        self.__add_row('coinprice', (int(datetime.now().timestamp()), price))
+        self.__db.insert_sample('coinprice', price=price)
 
     def update_balance(self, free, locked, risked):
-        self.__add_row('balance', (int(datetime.now().timestamp()), free, locked, risked))
+        self.__db.insert_sample('balance', free=free, locked=locked, risked=risked)
 
     def update_contracts(self, count, storage, io, ephemeral):
-        self.__add_row('contracts', (int(datetime.now().timestamp()), count, storage, io, ephemeral))
+        self.__db.insert_sample('contracts', count=count, storage=storage, io=io, ephemeral=ephemeral)
 
     def add_blocks(self, data):
-        self.__add_rows('blocks', list((x, int(y.timestamp())) for x, y in data))
+        self.__db.executemany(self.__inserters['blocks'], list((x, int(y.timestamp())) for x, y in data))
 
     def get_coinprice(self, timestamp):
-        command = """SELECT price FROM coinprice {0};"""
-        rows = self.__get_rows(command.format(self.__create_time_filter(timestamp)))
-        if rows is None:
-            return None
-        row = rows[len(rows)//2]
-        return row[0]
+        _, row = self.__db.nearest_sample('coinprice', ('price',), timestamp, self.__max_distance)
+        return row[0] if row is not None else None
 
-    def get_balance(self, timestamp):
-        command = """SELECT free, locked, risked FROM balance {0};"""
-        rows = self.__get_rows(command.format(self.__create_time_filter(timestamp)))
+    def get_latest_coinprice(self):
+        rows = self.__db.query('SELECT timestamp, price FROM coinprice WHERE price IS NOT NULL ORDER BY timestamp DESC LIMIT 1;')
         if rows is None:
-            return None
-        row = rows[len(rows)//2]
-        return row[0], row[1], row[2]
+            return None, None
+        return datetime.fromtimestamp(rows[0][0]), rows[0][1]
 
     def get_contracts(self, timestamp):
-        command = """SELECT count, storage, io, ephemeral FROM contracts {0};"""
-        rows = self.__get_rows(command.format(self.__create_time_filter(timestamp)))
-        if rows is None:
-            return None, None, None, None
-        row = rows[len(rows)//2]
-        return row[0], row[1], row[2], row[3]
+        real_timestamp, row = self.__db.nearest_sample('contracts', ('count', 'storage', 'io', 'ephemeral'), timestamp, self.__max_distance)
+        if row is None:
+            return None, None, None, None, None
+        return real_timestamp, row[0], row[1], row[2], row[3]
 
     def get_height(self, timestamp):
         unix = int(timestamp.timestamp())
-        command = f'SELECT height FROM blocks WHERE timestamp < {unix} ORDER BY timestamp DESC LIMIT 1'
-        rows = self.__get_rows(command)
+        rows = self.__db.query('SELECT height FROM blocks WHERE timestamp < ? ORDER BY timestamp DESC LIMIT 1;', (unix,))
         return rows[0][0] if rows is not None else None
 
     def get_timestamp(self, height):
-        command = f'SELECT timestamp FROM blocks WHERE height == {height}'
-        rows = self.__get_rows(command)
+        rows = self.__db.query('SELECT timestamp FROM blocks WHERE height == ?;', (height,))
         return datetime.fromtimestamp(rows[0][0]) if rows is not None else None
 
     def get_oldest_height(self):
-        command = f'SELECT height, timestamp FROM blocks ORDER BY height ASC LIMIT 1'
-        rows = self.__get_rows(command)
+        rows = self.__db.query('SELECT height, timestamp FROM blocks ORDER BY height ASC LIMIT 1;')
         if rows is None:
             return None, None
         return rows[0][0], datetime.fromtimestamp(rows[0][1])
 
     def get_newest_height(self):
-        command = f'SELECT height, timestamp FROM blocks ORDER BY height DESC LIMIT 1'
-        rows = self.__get_rows(command)
+        rows = self.__db.query('SELECT height, timestamp FROM blocks ORDER BY height DESC LIMIT 1;')
         if rows is None:
             return None, None
         return rows[0][0], datetime.fromtimestamp(rows[0][1])
-
-    def __add_row(self, table, data):
-        self.__db.cursor().execute(self.__inserters[table], data)
-        self.__db.commit()
-
-    def __add_rows(self, table, data):
-        for row in data:
-            self.__db.cursor().execute(self.__inserters[table], row)
-        self.__db.commit()
-
-    def __get_rows(self, command):
-        cursor = self.__db.cursor()
-        cursor.execute(command)
-        rows = cursor.fetchall()
-
-        if len(rows) == 0:
-            return None
-        return rows
-
-    def __create_time_filter(self, timestamp, tolerance=timedelta(minutes=5)):
-        unix = int(timestamp.timestamp())
-        upper = unix + tolerance.total_seconds()
-        lower = unix - tolerance.total_seconds()
-        return f'WHERE timestamp < {upper} AND timestamp > {lower}'
\ No newline at end of file
@@ -1,5 +1,6 @@
 import aiohttp, asyncio
-from ...core import Plugin, Conversions, CsvExporter, Tablerenderer
+from ...core import Plugin, Conversions, CsvExporter, Sessionpool, Tablerenderer, Retrypolicy
+from ...core import ApiRequestFailedException, ApiTransientException
 from .opendtudb import Opendtudb
 
 class Opendtu(Plugin):
@@ -12,6 +13,7 @@ class Opendtu(Plugin):
 
         self.__host = self.config.get('192.168.4.1:80', 'host')
         self.__serial = self.config.get(None, 'serial')
+        self.__retry = Retrypolicy(base_delay=5.0)
 
         self.__db = Opendtudb(self.config.data['database'])
         self.__check_csv = CsvExporter(self.config.get(None, 'verbose_csv_export'))
@@ -21,26 +23,14 @@ class Opendtu(Plugin):
         scheduler.add_job(self.__summary_job, self.summary, self.config.get('0 0 * * *', 'summary_interval'))
 
     async def check(self):
-        async with aiohttp.ClientSession() as session:
-            retries = 3
-            while True:
-                try:
-                    if retries == 0:
-                        self.msg.debug(f'Failed to read live data from {self.__host}, no retry.')
-                        return
-                    retries -= 1
-                    async with session.get(f'http://{self.__host}/api/livedata/status') as response:
-                        json = await response.json()
-                        status = response.status
-                    if (status >= 200 and status <= 299):
-                        total_energy, day_energy = self.__get_energy(json)
-                        break
-                    else:
-                        self.msg.debug(f'Command api/livedata/status failed with code {status}, {retries} retries left')
-                except aiohttp.ClientConnectionError as e:
-                    self.msg.debug(f'Command api/livedata/status failed: {str(e)}, {retries} retries left')
-                await asyncio.sleep(10.0)
-            
+        async with Sessionpool.session(self.__host) as session:
+            try:
+                json = await self.__retry.run(self.__host, lambda: self.__get_live_data(session), self.msg.debug)
+            except ApiRequestFailedException:
+                self.msg.debug(f'Failed to read live data from {self.__host}, no retry.')
+                return
+        total_energy, day_energy = self.__get_energy(json)
+
         last_total_energy = self.__db.get_latest()
         if last_total_energy is None:
             self.msg.debug('No power history data available, skipping outputs.')
@@ -90,6 +80,19 @@ class Opendtu(Plugin):
             last_total = total
         self.msg.verbose(table.render())
 
+    async def __get_live_data(self, session):
+        try:
+            async with session.get(f'http://{self.__host}/api/livedata/status') as response:
+                json = await response.json()
+                status = response.status
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            self.msg.debug(f'Command api/livedata/status failed: {str(e)}')
+            raise ApiTransientException()
+        if not (status >= 200 and status <= 299):
+            self.msg.debug(f'Command api/livedata/status failed with code {status}')
+            raise ApiTransientException()
+        return json
+
     def __get_energy(self, json):
         if self.__serial is None:
             total_energy = round(Conversions.reverse_autorange( \
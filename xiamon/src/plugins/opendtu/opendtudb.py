@@ -1,43 +1,35 @@
-import sqlite3
-from pathlib import Path
 from datetime import datetime, timedelta
+from ...core import Database
 
 class Opendtudb():
+    __migrations = [
+        [
+            """CREATE INDEX IF NOT EXISTS energy_timestamp ON energy(timestamp);"""
+        ]
+    ]
+
     def __init__(self, file):
-        self.__path = Path(file)
-        if not self.__path.parent.exists():
-            raise FileNotFoundError(f'Path contains not existing directory: {file}')
-        self.__db = sqlite3.connect(self.__path)
-        self.__create_table()
+        self.__db = Database(file, [self.__create_table()], self.__migrations)
 
     def __del__(self):
         self.__db.close()
 
-    def __create_table(self):
-        command = """CREATE TABLE IF NOT EXISTS energy (
+    @staticmethod
+    def __create_table():
+        return """CREATE TABLE IF NOT EXISTS energy (
                         id integer PRIMARY KEY,
                         timestamp integer NOT NULL,
                         energy int NOT NULL
                     );"""
 
-        self.__db.cursor().execute(command)
-
     def add(self, energy):
-        command = """INSERT INTO energy(timestamp, energy)
-                        VALUES(?,?)"""
-        data = (int(datetime.now().timestamp()), energy)
-
-        self.__db.cursor().execute(command, data)
-        self.__db.commit()
+        self.__db.insert_sample('energy', energy=energy)
 
     def get_latest(self):
         command = """SELECT energy FROM energy ORDER BY timestamp DESC LIMIT 1;"""
 
-        cursor = self.__db.cursor()
-        cursor.execute(command)
-        rows = cursor.fetchall()
-
-        if len(rows) != 1:
+        rows = self.__db.query(command)
+        if rows is None:
             return None
         return rows[0][0]
     
@@ -45,20 +37,15 @@ class Opendtudb():
         unix = int(timestamp.timestamp())
         unix += tolerance.total_seconds()
 
-        cursor = self.__db.cursor()
-        
-        ts_command = f'SELECT timestamp FROM energy WHERE timestamp < {unix} ORDER BY timestamp DESC LIMIT 1'
-        cursor.execute(ts_command)
-        rows = cursor.fetchall()
-        if len(rows) != 1:
+        ts_command = 'SELECT timestamp FROM energy WHERE timestamp < ? ORDER BY timestamp DESC LIMIT 1'
+        rows = self.__db.query(ts_command, (unix,))
+        if rows is None:
             return None
         real_ts = rows[0][0]
 
-        command = f'SELECT timestamp, energy FROM energy WHERE timestamp >= {real_ts} ORDER BY timestamp ASC'
-        cursor.execute(command)
-        rows = cursor.fetchall()
+        command = 'SELECT timestamp, energy FROM energy WHERE timestamp >= ? ORDER BY timestamp ASC'
+        rows = self.__db.query(command, (real_ts,))
 
-        if len(rows) == 0:
+        if rows is None:
             return None
-        result = []
         return [(datetime.fromtimestamp(row[0]), row[1]) for row in rows]
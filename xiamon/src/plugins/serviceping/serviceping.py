@@ -1,6 +1,5 @@
-import aiohttp
 from collections import defaultdict
-from ...core import Plugin
+from ...core import Plugin, Sessionpool
 from ...core import Chiarpc, Siaapi, ApiRequestFailedException
 
 class Serviceping(Plugin):
@@ -46,7 +45,7 @@ class Serviceping(Plugin):
             self.__rpc = Chiarpc(config['host'], config['cert'], config['key'], plugin)
 
         async def check(self):
-            async with aiohttp.ClientSession() as session:
+            async with self.__rpc.create_session() as session:
                 try:
                     await self.__rpc.post(session, 'healthz')
                     return True
@@ -70,7 +69,7 @@ class Serviceping(Plugin):
             self.__host = config['host']
 
         async def check(self):
-            async with aiohttp.ClientSession() as session:
+            async with Sessionpool.session(self.__host) as session:
                 try:
                     async with session.get(f'http://{self.__host}/static') as response:
                         status = response.status
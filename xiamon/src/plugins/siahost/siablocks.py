@@ -1,66 +1,96 @@
+import asyncio
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from ...core import Siablockdata, ApiRequestFailedException
+from ...core import Siablockdata
 
 class Siablocks:
+    parallel_requests = 4
+    batch_size = 144
+    cache_size = 4096
 
     def __init__(self, plugin, api, database):
         self.__plugin = plugin
         self.__api = api
         self.__db = database
+        self.__timestamps = OrderedDict()
 
     async def update(self, consensus):
         await self.__get_newest_blocks(consensus.height)
 
     async def at_time(self, timestamp, consensus):
+        return (await self.at_times([timestamp], consensus))[timestamp]
+
+    async def at_times(self, timestamps, consensus):
         current_height = consensus.height
         now = datetime.now()
-        if timestamp > now:
-            return current_height + int(timestamp - now).total_seconds() / 600
-        else:
-            await self.__get_newest_blocks(current_height)
-            height = self.__db.get_height(timestamp)
-            if height is not None:
-                return height
-            while True:
-                oldest_height, oldest_cache_time = self.__db.get_oldest_height()
-                if oldest_cache_time < timestamp:
-                    break
-                end = oldest_height - 1
-                begin = end - 35
-                self.__plugin.msg.debug(f'Blocks cache miss ({oldest_cache_time} vs. {timestamp}), loading heights {begin} - {end}.')
-                if begin < 0:
-                    raise Exception('Blocks with height < 0 are not possible.')
-                await self.__get_blocks_from_consensus(begin, end)
-            height = self.__db.get_height(timestamp)
-            if height is None:
-                raise Exception('Blocks cache miss after cache update.')
-            return height
+        await self.__get_newest_blocks(current_height)
+        heights = {}
+        # ascending order lets later searches start from the blocks loaded by earlier ones
+        for timestamp in sorted(timestamps):
+            if timestamp > now:
+                heights[timestamp] = current_height + int((timestamp - now).total_seconds() / 600)
+            else:
+                heights[timestamp] = await self.__search(timestamp)
+        return heights
 
     async def at_height(self, height, consensus):
+        return (await self.at_heights([height], consensus))[height]
+
+    async def at_heights(self, heights, consensus):
         current_height = consensus.height
         await self.__get_newest_blocks(current_height)
-        if height > current_height:
-            timestamp = self.__db.get_timestamp(current_height)
-            if timestamp is None:
-                raise Exception('Blocks cache miss after cache update.')
-            return timestamp + timedelta(minutes=(10 * (height - current_height)))
-        else:
-            timestamp = self.__db.get_timestamp(height)
+        past = {min(x, current_height) for x in heights}
+        timestamps = {}
+        for height in past:
+            timestamp = self.__timestamps.get(height, None)
             if timestamp is not None:
-                return timestamp
-            oldest_height = self.__db.get_oldest_height()[0]
-            for i in reversed(range(height, oldest_height, 36)):
-                end = i + 35
-                self.__plugin.msg.debug(f'Blocks cache miss ({oldest_height} vs. {height}), loading heights {i} - {end}.')
-                await self.__get_blocks_from_consensus(i, end)
-            timestamp = self.__db.get_timestamp(height)
-            if timestamp is None:
-                raise Exception('Blocks cache miss after cache update.')
-            return timestamp
+                self.__timestamps.move_to_end(height)
+                timestamps[height] = timestamp
+        missing = past.difference(timestamps)
+        if len(missing) > 0:
+            stored = self.__db.get_timestamps(missing)
+            missing.difference_update(stored)
+            if len(missing) > 0:
+                self.__plugin.msg.debug(f'Blocks cache miss, loading {len(missing)} heights.')
+                stored.update(await self.__get_blocks_from_consensus(sorted(missing)))
+            for height, timestamp in stored.items():
+                timestamps[height] = timestamp
+                self.__timestamps[height] = timestamp
+            while len(self.__timestamps) > self.cache_size:
+                self.__timestamps.popitem(last=False)
+        if current_height not in timestamps and any(x > current_height for x in heights):
+            raise Exception('Blocks cache miss after cache update.')
+        # heights in the future are estimated with one block every 10 minutes
+        return {x: timestamps[x] if x <= current_height else timestamps[current_height] + timedelta(minutes=(10 * (x - current_height)))
+                for x in heights}
 
     async def duration(self, begin, end, consensus):
         return await self.at_height(end, consensus) - await self.at_height(begin, consensus)       
 
+    async def __search(self, timestamp):
+        # the cached blocks are sparse checkpoints, so the bracket around the timestamp
+        # is narrowed by fetching single blocks until the last block before it is known
+        lower, upper = self.__db.get_blocks_around(timestamp)
+        if upper is None:
+            return lower[0]
+        if lower is None:
+            lower, upper = await self.__find_lower_bound(timestamp, upper)
+        interpolate = True
+        while upper[0] - lower[0] > 1:
+            if interpolate and upper[1] > lower[1]:
+                share = (timestamp - lower[1]) / (upper[1] - lower[1])
+                height = lower[0] + int(share * (upper[0] - lower[0]))
+            else:
+                height = (lower[0] + upper[0]) // 2
+            # alternating with bisection keeps the number of requests logarithmic on uneven block times
+            interpolate = not interpolate
+            block = await self.__get_block_at(min(max(height, lower[0] + 1), upper[0] - 1))
+            if block[1] < timestamp:
+                lower = block
+            else:
+                upper = block
+        return lower[0]
+
     async def __get_newest_blocks(self, current_height):
         begin, _ = self.__db.get_newest_height()
         if begin is None:
@@ -70,16 +100,52 @@ class Siablocks:
         else:
             begin += 1
         self.__plugin.msg.debug(f'Updating blocks cache, loading heights {begin} - {current_height}.')
-        await self.__get_blocks_from_consensus(begin, current_height)
+        await self.__get_blocks_from_consensus(list(range(begin, current_height + 1)))
 
-    async def __get_blocks_from_consensus(self, begin, end):
+    async def __get_blocks_from_consensus(self, heights):
+        # batches are stored in ascending order, so the newest cached block
+        # has no gaps below it if a request fails in between
+        blocks = {}
+        semaphore = asyncio.Semaphore(self.parallel_requests)
         async with self.__api.create_session() as session:
-            try:
-                blocks = []
-                for i in reversed(range(begin, end + 1)):
-                    json = await self.__api.get(session, '/consensus/blocks', {'height': i})
-                    block = Siablockdata(json)
-                    blocks.append((block.height, block.timestamp))
-                self.__db.add_blocks(blocks)
-            except ApiRequestFailedException:
-                raise
+            for offset in range(0, len(heights), self.batch_size):
+                batch = heights[offset:offset + self.batch_size]
+                results = await asyncio.gather(*(self.__limited(semaphore, self.__get_block(session, x)) for x in batch), return_exceptions=True)
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                self.__db.add_blocks(results)
+                blocks.update(results)
+                if len(heights) > self.batch_size:
+                    self.__plugin.msg.debug(f'Blocks cache update: {offset + len(batch)} of {len(heights)} heights loaded.')
+        return blocks
+
+    async def __find_lower_bound(self, timestamp, upper):
+        margin = 36
+        while True:
+            # one block every 10 minutes, with a growing margin
+            height = upper[0] - int((upper[1] - timestamp).total_seconds() / 600) - margin
+            if upper[0] == 0:
+                raise Exception('Blocks with height < 0 are not possible.')
+            self.__plugin.msg.debug(f'Blocks cache miss ({upper[1]} vs. {timestamp}), checking height {max(height, 0)}.')
+            block = await self.__get_block_at(max(height, 0))
+            if block[1] < timestamp:
+                return block, upper
+            upper = block
+            margin *= 2
+
+    async def __get_block_at(self, height):
+        async with self.__api.create_session() as session:
+            block = await self.__get_block(session, height)
+        self.__db.add_blocks([block])
+        return block
+
+    async def __get_block(self, session, height):
+        json = await self.__api.get(session, '/consensus/blocks', {'height': height}, cached=False)
+        block = Siablockdata(json)
+        return block.height, block.timestamp
+
+    @staticmethod
+    async def __limited(semaphore, coroutine):
+        async with semaphore:
+            return await coroutine
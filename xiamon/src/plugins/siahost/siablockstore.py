@@ -0,0 +1,85 @@
+import bisect, mmap, struct
+from datetime import datetime
+from pathlib import Path
+
+class Siablockstore():
+    # one little endian uint32 timestamp per height, 0 marks heights not loaded yet
+    __entry = struct.Struct('<I')
+    growth = 4096
+
+    def __init__(self, file):
+        # set first, so close works even if opening the file fails
+        self.__file = None
+        self.__map = None
+        self.__path = Path(file)
+        if not self.__path.parent.exists():
+            raise FileNotFoundError(f'Path contains not existing directory: {file}')
+        self.__path.touch(exist_ok=True)
+        self.__file = open(self.__path, 'r+b')
+        if self.__path.stat().st_size < self.growth * self.__entry.size:
+            self.__file.truncate(self.growth * self.__entry.size)
+        self.__map = mmap.mmap(self.__file.fileno(), 0)
+        self.__heights = [i for i, (x,) in enumerate(self.__entry.iter_unpack(self.__map)) if x != 0]
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if self.__map is not None and not self.__map.closed:
+            self.__map.close()
+        if self.__file is not None:
+            self.__file.close()
+
+    def add_blocks(self, data):
+        for height, timestamp in data:
+            if (height + 1) * self.__entry.size > len(self.__map):
+                self.__grow(height)
+            if self.__read(height) == 0:
+                bisect.insort(self.__heights, height)
+            self.__entry.pack_into(self.__map, height * self.__entry.size, int(timestamp.timestamp()))
+        self.__map.flush()
+
+    def get_blocks_around(self, timestamp):
+        unix = int(timestamp.timestamp())
+        lower = 0
+        upper = len(self.__heights)
+        while lower < upper:
+            middle = (lower + upper) // 2
+            if self.__read(self.__heights[middle]) < unix:
+                lower = middle + 1
+            else:
+                upper = middle
+        before = self.__block(self.__heights[lower - 1]) if lower > 0 else None
+        after = self.__block(self.__heights[lower]) if lower < len(self.__heights) else None
+        return before, after
+
+    def get_timestamp(self, height):
+        if height < 0 or (height + 1) * self.__entry.size > len(self.__map):
+            return None
+        unix = self.__read(height)
+        return datetime.fromtimestamp(unix) if unix != 0 else None
+
+    def get_timestamps(self, heights):
+        timestamps = {}
+        for height in heights:
+            timestamp = self.get_timestamp(height)
+            if timestamp is not None:
+                timestamps[height] = timestamp
+        return timestamps
+
+    def get_newest_height(self):
+        if len(self.__heights) == 0:
+            return None, None
+        return self.__block(self.__heights[-1])
+
+    def __block(self, height):
+        return height, datetime.fromtimestamp(self.__read(height))
+
+    def __read(self, height):
+        return self.__entry.unpack_from(self.__map, height * self.__entry.size)[0]
+
+    def __grow(self, height):
+        size = (height // self.growth + 1) * self.growth * self.__entry.size
+        self.__map.close()
+        self.__file.truncate(size)
+        self.__map = mmap.mmap(self.__file.fileno(), 0)
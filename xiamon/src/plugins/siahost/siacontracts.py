@@ -1,3 +1,4 @@
+import bisect
 from datetime import datetime, timedelta
 from collections import namedtuple
 
@@ -14,47 +15,29 @@ class Siacontracts:
         self.__db = database
         self.__blocks = blocks
 
-    async def summary(self, consensus, contracts, last_execution):
+    async def summary(self, consensus, last_execution):
         height = consensus.height
-        last_height = await self.__blocks.at_time(last_execution, consensus)
-
-        active_contracts = 0
-        recent_started = 0
-        recent_ended = 0
-        failed_proofs = 0
-
-        settled_earnings = 0
-        pending_storage_earnings = 0
-        pending_io_earnings = 0
-        pending_ephemeral_earnings = 0
-
-        for contract in contracts.contracts:
-            if contract.start > last_height:
-                recent_started += 1
-            if contract.end > last_height and contract.end <= height:
-                recent_ended += 1
-                if contract.proof_success:
-                    settled_earnings += contract.storage_revenue
-                    settled_earnings += contract.io_revenue
-                    settled_earnings += contract.ephemeral_revenue
-                else:
-                    failed_proofs += 1
-
-            if contract.end <= height:
-                continue
-            active_contracts += 1
-            pending_storage_earnings += contract.storage_revenue
-            pending_io_earnings += contract.io_revenue
-            pending_ephemeral_earnings += contract.ephemeral_revenue
-        
+        # the old pending earnings come from the sample nearest to the last execution, at most sample_max_distance away,
+        # the settled earnings are counted from the time of that sample, so both cover the same interval
+        last_timestamp, _, last_pending_storage_earnings, last_pending_io_earnings, last_pending_ephemeral_earnings = \
+            self.__db.get_contracts(last_execution)
+        last_height = await self.__blocks.at_time(last_timestamp if last_timestamp is not None else last_execution, consensus)
+
+        # the contract list in the database was synced by the caller
+        recent_started = self.__db.get_started_contracts(last_height)
+        recent_ended = self.__db.get_contract_revenues(last_height + 1, height + 1)[0]
+        settled_proofs, *settled_revenues = self.__db.get_contract_revenues(last_height + 1, height + 1, succeeded=True)
+        failed_proofs = recent_ended - settled_proofs
+        settled_earnings = sum(settled_revenues)
+
+        active_contracts, pending_storage_earnings, pending_io_earnings, pending_ephemeral_earnings = \
+            self.__db.get_contract_revenues(height + 1)
+
         self.__db.update_contracts(active_contracts, 
             round(pending_storage_earnings), 
             round(pending_io_earnings), 
             round(pending_ephemeral_earnings))
 
-        _, last_pending_storage_earnings, last_pending_io_earnings, last_pending_ephemeral_earnings = \
-            self.__db.get_contracts(last_execution)
-
         last_pending_earnings = last_pending_storage_earnings + last_pending_io_earnings + last_pending_ephemeral_earnings \
             if None not in (last_pending_storage_earnings, last_pending_io_earnings, last_pending_ephemeral_earnings) else None
         pendings_earnings = pending_storage_earnings + pending_io_earnings + pending_ephemeral_earnings
@@ -80,14 +63,14 @@ class Siacontracts:
         id = 0
         renderer = Tablerenderer(['ID', 'Size', 'Started', 'Ending', 'Locked', 'Storage', 'IO', 'Ephemeral'])
         data = renderer.data
-        for contract in sorted(contracts.contracts, key=lambda x: x.end):
-            if contract.end <= height:
-                continue
-
+        active = contracts.ending(height + 1)
+        timestamps = await self.__blocks.at_heights({height, *active.start, *active.end}, consensus)
+        now = timestamps[height]
+        for contract in active.contracts:
             data['ID'].append(f'{id}')
             data['Size'].append('{x[0]:.0f} {x[1]}'.format(x=Conversions.byte_to_auto(contract.datasize)))
-            data['Started'].append(f'{(await self.__blocks.duration(contract.start, height, consensus)).days} d')
-            data['Ending'].append(f'{(await self.__blocks.duration(height, contract.end, consensus)).days} d')
+            data['Started'].append(f'{(now - timestamps[contract.start]).days} d')
+            data['Ending'].append(f'{(timestamps[contract.end] - now).days} d')
             data['Locked'].append('{x[0]:.0f} {x[1]}'.format(x=Conversions.siacoin_to_auto(contract.locked_collateral)))
             data['Storage'].append('{x[0]:.0f} {x[1]}'.format(x=Conversions.siacoin_to_auto(contract.storage_revenue)))
             data['IO'].append('{x[0]:.0f} {x[1]}'.format(x=Conversions.siacoin_to_auto(contract.io_revenue)))
@@ -95,7 +78,7 @@ class Siacontracts:
             id += 1
         self.__plugin.msg.debug(renderer.render())
 
-    async def accounting(self, consensus, contracts):
+    async def accounting(self, consensus):
         now = datetime.now()
         max_timestamp = now - timedelta(hours=1)
         last_execution = self.__scheduler.get_last_execution(f'{self.__plugin.name}-accounting')
@@ -110,18 +93,14 @@ class Siacontracts:
 
         total_rewards = self.RewardTypes(0, 0, 0, 0, 0)
 
-        while now > last_execution:
-            yesterday = now - timedelta(days=1)
-
-            begin_height = await self.__blocks.at_time(datetime.combine(yesterday, datetime.min.time()), consensus) + 1
-            end_height = await self.__blocks.at_time(datetime.combine(now, datetime.min.time()), consensus)
-
-            coinprice = self.__db.get_coinprice(datetime.combine(now, datetime.min.time()))
+        earnings = await self.__get_earnings(last_execution, now, consensus)
 
+        for day in sorted(earnings):
+            begin_height, _, *revenues, coinprice = earnings[day]
             day_rewards = self.__add_to_table(
-                yesterday,
+                day,
                 begin_height,
-                list(filter(lambda x: x.end >= begin_height and x.end < end_height, contracts.contracts)),
+                revenues,
                 coinprice if coinprice is not None else 0,
                 table
             )
@@ -133,18 +112,48 @@ class Siacontracts:
                 total_rewards.fiat + day_rewards.fiat
             )
 
-            now = yesterday
-
-        table.reverse()
-
         self.__add_summary(table, total_rewards)
 
         self.__plugin.msg.accounting(table.render())
 
-    def __get_rewards(self, contracts):
-        storage = sum(x.storage_revenue for x in contracts)
-        io = sum(x.io_revenue for x in contracts)
-        ephemeral = sum(x.ephemeral_revenue for x in contracts)
+    async def close_days(self, consensus):
+        today = datetime.now().date()
+        last_day = self.__db.get_last_earnings_day()
+        first_day = last_day + timedelta(days=1) if last_day is not None else today - timedelta(days=1)
+        if first_day < today:
+            await self.__get_earnings(first_day, today, consensus)
+
+    async def __get_earnings(self, begin, end, consensus):
+        # closed days are taken from the ledger, only the missing ones are calculated from the contracts
+        earnings = self.__db.get_earnings(begin, end)
+        missing = [begin + timedelta(days=x) for x in range((end - begin).days) if begin + timedelta(days=x) not in earnings]
+        if len(missing) == 0:
+            return earnings
+
+        # all day boundaries are resolved at once and the contracts ending in between
+        # are loaded sorted by proof deadline, so each day is a bisected slice of them
+        boundaries = {datetime.combine(x + timedelta(days=y), datetime.min.time()) for x in missing for y in (0, 1)}
+        heights = await self.__blocks.at_times(boundaries, consensus)
+        revenues = self.__db.get_contract_revenue_list(min(heights.values()) + 1, max(heights.values()))
+        deadlines = [x[0] for x in revenues]
+
+        closed = {}
+        for day in missing:
+            begin_height = heights[datetime.combine(day, datetime.min.time())] + 1
+            end_height = heights[datetime.combine(day + timedelta(days=1), datetime.min.time())]
+            coinprice = self.__db.get_coinprice(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+            contracts = revenues[bisect.bisect_left(deadlines, begin_height):bisect.bisect_left(deadlines, end_height)]
+            closed[day] = (begin_height, end_height, len(contracts),
+                sum(x[1] for x in contracts), sum(x[2] for x in contracts), sum(x[3] for x in contracts), coinprice)
+        # a day is only final once a block after its end is known
+        final = {x: y for x, y in closed.items() if y[1] < consensus.height}
+        self.__db.add_earnings(final)
+        self.__plugin.msg.debug(f'Earnings ledger: {len(final)} days closed.')
+        earnings.update(closed)
+        return earnings
+
+    def __get_rewards(self, revenues):
+        _, storage, io, ephemeral = revenues
         total = storage + io + ephemeral
         fiat = self.__coinprice.to_fiat(total)
 
@@ -157,11 +166,11 @@ class Siacontracts:
         table.data['Sum'].append(f'{round(rewards.total)} SC')
         table.data['Fiat'].append(f'{rewards.fiat:.2f} {self.__coinprice.currency}')
 
-    def __add_to_table(self, date, height, contracts, coinprice, table):
-        rewards = self.__get_rewards(contracts)
+    def __add_to_table(self, date, height, revenues, coinprice, table):
+        rewards = self.__get_rewards(revenues)
         table.data['Date'].append(date.strftime("%d.%m.%Y"))
         table.data['Height'].append(height)
-        table.data['Contracts'].append(len(contracts))
+        table.data['Contracts'].append(revenues[0])
         table.data['Coinprice'].append(f'{coinprice:.8f} {self.__coinprice.currency}/SC')
         self.__add_row(table, rewards)
         return rewards
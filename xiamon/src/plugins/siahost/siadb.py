@@ -1,7 +1,7 @@
-import sqlite3
-from pathlib import Path
 from datetime import datetime, timedelta
 
+from ...core import Database
+
 class Siadb():
     __tables = [
         """CREATE TABLE IF NOT EXISTS coinprice (
@@ -34,125 +34,188 @@ class Siadb():
         """CREATE TABLE IF NOT EXISTS blocks (
             height integer PRIMARY KEY,
             timestamp integer NOT NULL
+        );""",
+        """CREATE TABLE IF NOT EXISTS contract (
+            id text PRIMARY KEY,
+            negotiationheight integer NOT NULL,
+            proofdeadline integer NOT NULL,
+            datasize integer NOT NULL,
+            locked_collateral real NOT NULL,
+            risked_collateral real NOT NULL,
+            storage_revenue real NOT NULL,
+            io_revenue real NOT NULL,
+            ephemeral_revenue real NOT NULL,
+            status text NOT NULL
+        );""",
+        """CREATE INDEX IF NOT EXISTS contract_proofdeadline ON contract(proofdeadline);""",
+        """CREATE TABLE IF NOT EXISTS earnings (
+            day integer PRIMARY KEY,
+            begin_height integer NOT NULL,
+            end_height integer NOT NULL,
+            contracts integer NOT NULL,
+            storage real NOT NULL,
+            io real NOT NULL,
+            ephemeral real NOT NULL,
+            coinprice real
         );"""
     ]
+    __migrations = [
+        [
+            """CREATE INDEX IF NOT EXISTS coinprice_timestamp ON coinprice(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS balance_timestamp ON balance(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS traffic_timestamp ON traffic(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS contracts_timestamp ON contracts(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS blocks_timestamp ON blocks(timestamp);"""
+        ]
+    ]
     __inserters = {
-        'coinprice' : """INSERT INTO coinprice(timestamp, price)
-                        VALUES(?,?)""",
-        'balance' : """INSERT INTO balance(timestamp, free, locked, risked)
-                        VALUES(?,?,?,?)""",
-        'traffic' : """INSERT INTO traffic(timestamp, epoch, upload, download)
-                        VALUES(?,?,?,?)""",
-        'contracts' : """INSERT INTO contracts(timestamp, count, storage, io, ephemeral)
-                        VALUES(?,?,?,?,?)""",
         'blocks' : """INSERT OR IGNORE INTO blocks(height, timestamp)
-                        VALUES(?,?)"""
+                        VALUES(?,?)""",
+        'contract' : """INSERT OR REPLACE INTO contract(id, negotiationheight, proofdeadline, datasize, locked_collateral,
+                            risked_collateral, storage_revenue, io_revenue, ephemeral_revenue, status)
+                        VALUES(?,?,?,?,?,?,?,?,?,?)""",
+        'earnings' : """INSERT OR REPLACE INTO earnings(day, begin_height, end_height, contracts, storage, io, ephemeral, coinprice)
+                        VALUES(?,?,?,?,?,?,?,?)"""
     }
 
-    def __init__(self, file):
-        self.__path = Path(file)
-        if not self.__path.parent.exists():
-            raise FileNotFoundError(f'Path contains not existing directory: {file}')
-        self.__db = sqlite3.connect(self.__path)
-        cursor = self.__db.cursor()
-        for cmd in self.__tables:
-            cursor.execute(cmd)
+    def __init__(self, file, max_distance=timedelta(minutes=30)):
+        self.__db = Database(file, self.__tables, self.__migrations)
+        self.__max_distance = max_distance
 
     def __del__(self):
         self.__db.close()
 
     def update_coinprice(self, price):
-        self.__add_row('coinprice', (int(datetime.now().timestamp()), price))
+        self.__db.insert_sample('coinprice', price=price)
 
     def update_balance(self, free, locked, risked):
-        self.__add_row('balance', (int(datetime.now().timestamp()), free, locked, risked))
+        self.__db.insert_sample('balance', free=free, locked=locked, risked=risked)
 
     def update_traffic(self, epoch, upload, download):
-        self.__add_row('traffic', (int(datetime.now().timestamp()), epoch, upload, download))
+        self.__db.insert_sample('traffic', epoch=epoch, upload=upload, download=download)
 
     def update_contracts(self, count, storage, io, ephemeral):
-        self.__add_row('contracts', (int(datetime.now().timestamp()), count, storage, io, ephemeral))
+        self.__db.insert_sample('contracts', count=count, storage=storage, io=io, ephemeral=ephemeral)
 
     def add_blocks(self, data):
-        self.__add_rows('blocks', list((x, int(y.timestamp())) for x, y in data))
+        self.__db.executemany(self.__inserters['blocks'], list((x, int(y.timestamp())) for x, y in data))
+
+    def update_contract_list(self, contracts):
+        if len(contracts) == 0:
+            return 0
+        rows = list(zip(contracts.id, contracts.start, contracts.end,
+            contracts.column('datasize'), contracts.column('locked_collateral'), contracts.column('risked_collateral'),
+            contracts.column('storage_revenue'), contracts.column('io_revenue'), contracts.column('ephemeral_revenue'),
+            contracts.status))
+        command = """SELECT id, negotiationheight, proofdeadline, datasize, locked_collateral,
+                        risked_collateral, storage_revenue, io_revenue, ephemeral_revenue, status
+                    FROM contract WHERE proofdeadline >= ?;"""
+        stored = set(self.__db.query(command, (contracts.end[0],)) or [])
+        changed = [x for x in rows if x not in stored]
+        self.__db.executemany(self.__inserters['contract'], changed)
+        return len(changed)
+
+    def get_contract_sync_height(self):
+        # contracts ending below this height are resolved and stored already, so they do not change any more;
+        # new contracts are negotiated after all stored ones, so they end above the newest negotiation height
+        rows = self.__db.query("""SELECT MIN(CASE WHEN status == 'obligationUnresolved' THEN proofdeadline END), MAX(negotiationheight)
+                                FROM contract;""")
+        unresolved, negotiated = rows[0]
+        if negotiated is None:
+            return None
+        return min(unresolved, negotiated) if unresolved is not None else negotiated
+
+    def get_started_contracts(self, height):
+        command = 'SELECT COUNT(*) FROM contract WHERE proofdeadline > ? AND negotiationheight > ?;'
+        return self.__db.query(command, (height, height))[0][0]
+
+    def get_contract_revenues(self, begin=None, end=None, succeeded=False):
+        conditions = []
+        data = []
+        if begin is not None:
+            conditions.append('proofdeadline >= ?')
+            data.append(begin)
+        if end is not None:
+            conditions.append('proofdeadline < ?')
+            data.append(end)
+        if succeeded:
+            conditions.append("status == 'obligationSucceeded'")
+        command = f"""SELECT COUNT(*), TOTAL(storage_revenue), TOTAL(io_revenue), TOTAL(ephemeral_revenue) FROM contract
+                    {'WHERE ' + ' AND '.join(conditions) if len(conditions) > 0 else ''};"""
+        return self.__db.query(command, data)[0]
+
+    def get_contract_revenue_list(self, begin, end):
+        command = """SELECT proofdeadline, storage_revenue, io_revenue, ephemeral_revenue FROM contract
+                    WHERE proofdeadline >= ? AND proofdeadline < ? ORDER BY proofdeadline;"""
+        rows = self.__db.query(command, (begin, end))
+        return rows if rows is not None else []
+
+    def add_earnings(self, data):
+        self.__db.executemany(self.__inserters['earnings'], list((self.__day_to_unix(x), *y) for x, y in data.items()))
+
+    def get_earnings(self, begin, end):
+        command = """SELECT day, begin_height, end_height, contracts, storage, io, ephemeral, coinprice FROM earnings
+                    WHERE day >= ? AND day < ?;"""
+        rows = self.__db.query(command, (self.__day_to_unix(begin), self.__day_to_unix(end)))
+        return {datetime.fromtimestamp(x[0]).date(): x[1:] for x in rows} if rows is not None else {}
+
+    def get_last_earnings_day(self):
+        rows = self.__db.query('SELECT MAX(day) FROM earnings;')
+        return datetime.fromtimestamp(rows[0][0]).date() if rows[0][0] is not None else None
 
     def get_coinprice(self, timestamp):
-        command = """SELECT price FROM coinprice {0};"""
-        rows = self.__get_rows(command.format(self.__create_time_filter(timestamp)))
-        if rows is None:
-            return None
-        row = rows[len(rows)//2]
-        return row[0]
+        _, row = self.__db.nearest_sample('coinprice', ('price',), timestamp, self.__max_distance)
+        return row[0] if row is not None else None
 
-    def get_balance(self, timestamp):
-        command = """SELECT free, locked, risked FROM balance {0};"""
-        rows = self.__get_rows(command.format(self.__create_time_filter(timestamp)))
+    def get_latest_coinprice(self):
+        rows = self.__db.query('SELECT timestamp, price FROM coinprice WHERE price IS NOT NULL ORDER BY timestamp DESC LIMIT 1;')
         if rows is None:
-            return None
-        row = rows[len(rows)//2]
-        return row[0], row[1], row[2]
+            return None, None
+        return datetime.fromtimestamp(rows[0][0]), rows[0][1]
 
     def get_traffic(self, timestamp):
-        command = """SELECT epoch, upload, download FROM traffic {0};"""
-        rows = self.__get_rows(command.format(self.__create_time_filter(timestamp)))
-        if rows is None:
-            return None, None, None
-        row = rows[len(rows)//2]
-        return row[0], row[1], row[2]
+        real_timestamp, row = self.__db.nearest_sample('traffic', ('epoch', 'upload', 'download'), timestamp, self.__max_distance)
+        if row is None:
+            return None, None, None, None
+        return real_timestamp, row[0], row[1], row[2]
 
     def get_contracts(self, timestamp):
-        command = """SELECT count, storage, io, ephemeral FROM contracts {0};"""
-        rows = self.__get_rows(command.format(self.__create_time_filter(timestamp)))
-        if rows is None:
-            return None, None, None, None
-        row = rows[len(rows)//2]
-        return row[0], row[1], row[2], row[3]
+        real_timestamp, row = self.__db.nearest_sample('contracts', ('count', 'storage', 'io', 'ephemeral'), timestamp, self.__max_distance)
+        if row is None:
+            return None, None, None, None, None
+        return real_timestamp, row[0], row[1], row[2], row[3]
 
-    def get_height(self, timestamp):
+    def get_blocks_around(self, timestamp):
         unix = int(timestamp.timestamp())
-        command = f'SELECT height FROM blocks WHERE timestamp < {unix} ORDER BY timestamp DESC LIMIT 1'
-        rows = self.__get_rows(command)
-        return rows[0][0] if rows is not None else None
+        rows = self.__db.query('SELECT height, timestamp FROM blocks WHERE timestamp < ? ORDER BY height DESC LIMIT 1;', (unix,))
+        lower = (rows[0][0], datetime.fromtimestamp(rows[0][1])) if rows is not None else None
+        lower_height = lower[0] if lower is not None else -1
+        rows = self.__db.query('SELECT height, timestamp FROM blocks WHERE timestamp >= ? AND height > ? ORDER BY height ASC LIMIT 1;',
+            (unix, lower_height))
+        upper = (rows[0][0], datetime.fromtimestamp(rows[0][1])) if rows is not None else None
+        return lower, upper
 
     def get_timestamp(self, height):
-        command = f'SELECT timestamp FROM blocks WHERE height == {height}'
-        rows = self.__get_rows(command)
+        rows = self.__db.query('SELECT timestamp FROM blocks WHERE height == ?;', (height,))
         return datetime.fromtimestamp(rows[0][0]) if rows is not None else None
 
-    def get_oldest_height(self):
-        command = f'SELECT height, timestamp FROM blocks ORDER BY height ASC LIMIT 1'
-        rows = self.__get_rows(command)
-        if rows is None:
-            return None, None
-        return rows[0][0], datetime.fromtimestamp(rows[0][1])
+    def get_timestamps(self, heights):
+        heights = list(heights)
+        timestamps = {}
+        # chunks stay below the variable limit of older sqlite versions
+        for offset in range(0, len(heights), 500):
+            chunk = heights[offset:offset + 500]
+            command = f'SELECT height, timestamp FROM blocks WHERE height IN ({",".join("?" * len(chunk))});'
+            for height, timestamp in self.__db.query(command, chunk) or []:
+                timestamps[height] = datetime.fromtimestamp(timestamp)
+        return timestamps
 
     def get_newest_height(self):
-        command = f'SELECT height, timestamp FROM blocks ORDER BY height DESC LIMIT 1'
-        rows = self.__get_rows(command)
+        rows = self.__db.query('SELECT height, timestamp FROM blocks ORDER BY height DESC LIMIT 1;')
         if rows is None:
             return None, None
         return rows[0][0], datetime.fromtimestamp(rows[0][1])
 
-    def __add_row(self, table, data):
-        self.__db.cursor().execute(self.__inserters[table], data)
-        self.__db.commit()
-
-    def __add_rows(self, table, data):
-        for row in data:
-            self.__db.cursor().execute(self.__inserters[table], row)
-        self.__db.commit()
-
-    def __get_rows(self, command):
-        cursor = self.__db.cursor()
-        cursor.execute(command)
-        rows = cursor.fetchall()
-
-        if len(rows) == 0:
-            return None
-        return rows
-
-    def __create_time_filter(self, timestamp, tolerance=timedelta(minutes=5)):
-        unix = int(timestamp.timestamp())
-        upper = unix + tolerance.total_seconds()
-        lower = unix - tolerance.total_seconds()
-        return f'WHERE timestamp < {upper} AND timestamp > {lower}'
\ No newline at end of file
+    @staticmethod
+    def __day_to_unix(day):
+        return int(datetime.combine(day, datetime.min.time()).timestamp())
@@ -9,7 +9,7 @@ class Siahealth:
         self.__proof_deadlines = []
 
     def update_proof_deadlines(self, contracts):
-        self.__proof_deadlines = sorted(x.end for x in contracts.contracts)
+        self.__proof_deadlines = list(contracts.end)
 
     def check(self, consensus, host, wallet):
         if not consensus.synced:
@@ -1,7 +1,9 @@
-from ...core import Plugin, Siaapi, CsvExporter, Coinprice, ApiRequestFailedException
+from datetime import timedelta
+from ...core import Plugin, Siaapi, CsvExporter, Coinprice, ApiRequestFailedException, request_all
 from ...core import Siacontractsdata, Siaconsensusdata, Siahostdata, Siawalletdata, Siastoragedata, Siatrafficdata
 from .siaautoprice import Siaautoprice
 from .siablocks import Siablocks
+from .siablockstore import Siablockstore
 from .siadb import Siadb
 from .siahealth import Siahealth
 from .siacontracts import Siacontracts
@@ -23,12 +25,14 @@ class Siahost(Plugin):
 
         host = self.config.get('127.0.0.1:9980','host')
         password = self.config.data['password']
-        self.__api = Siaapi(host, password, super(Siahost, self))
+        self.__api = Siaapi(host, password, super(Siahost, self), self.response_cache())
 
-        self.__db = Siadb(self.config.data['database'])
+        self.__db = Siadb(self.config.data['database'], timedelta(minutes=self.config.get(30, 'sample_max_distance')))
         self.__csv = CsvExporter(self.config.get(None, 'csv_export'))
-        self.__blocks = Siablocks(super(Siahost, self), self.__api, self.__db)
-        self.__coinprice = Coinprice('siacoin', self.config.data['currency'])
+        block_store = self.config.get(None, 'block_store')
+        self.__block_store = Siablockstore(block_store) if block_store is not None else None
+        self.__blocks = Siablocks(super(Siahost, self), self.__api, self.__block_store if self.__block_store is not None else self.__db)
+        self.__coinprice = Coinprice('siacoin', self.config.data['currency'], self.__db.get_latest_coinprice, self.msg.debug)
 
         self.__health = Siahealth(self, self.config)
         self.__storage = Siastorage(self, self.__scheduler, self.__db)
@@ -46,11 +50,15 @@ class Siahost(Plugin):
         self.__scheduler.add_job(self.__daychange_job, self.daychange, '59 23 * * *')
         self.__scheduler.add_startup_job(self.__startup_job, self.startup)
 
+    def close(self):
+        if self.__block_store is not None:
+            self.__block_store.close()
+
     async def startup(self):
         try:
-            contracts = await self.__request('host/contracts', lambda x: Siacontractsdata(x))
+            contracts = await self.__request_contracts()
             self.__health.update_proof_deadlines(contracts)
-            self.msg.debug(f'Host has {len(contracts.contracts)} contracts in total.')
+            self.msg.debug(f'Synced {len(contracts)} unresolved or new contracts.')
         except ApiRequestFailedException:
             self.msg.error('Startup failed: some host queries failed.')
             return
@@ -58,9 +66,10 @@ class Siahost(Plugin):
     async def check(self):
         with self.message_aggregator():
             try:
-                consensus = await self.__request('consensus', lambda x: Siaconsensusdata(x))
-                host = await self.__request('host', lambda x: Siahostdata(x))
-                wallet = await self.__request('wallet', lambda x: Siawalletdata(x))
+                consensus, host, wallet = await request_all(
+                    self.__request('consensus', lambda x: Siaconsensusdata(x)),
+                    self.__request('host', lambda x: Siahostdata(x)),
+                    self.__request('wallet', lambda x: Siawalletdata(x)))
             except ApiRequestFailedException:
                 self.msg.debug('Check failed: some host queries failed.')
                 return
@@ -71,12 +80,13 @@ class Siahost(Plugin):
     async def summary(self):
         with self.message_aggregator():
             try:
-                consensus = await self.__request('consensus', lambda x: Siaconsensusdata(x))
-                host = await self.__request('host', lambda x: Siahostdata(x))
-                storage = await self.__request('host/storage', lambda x: Siastoragedata(x))
-                traffic = await self.__request('host/bandwidth', lambda x: Siatrafficdata(x))
-                contracts = await self.__request('host/contracts', lambda x: Siacontractsdata(x))
-                wallet = await self.__request('wallet', lambda x: Siawalletdata(x))
+                consensus, host, storage, traffic, contracts, wallet = await request_all(
+                    self.__request('consensus', lambda x: Siaconsensusdata(x)),
+                    self.__request('host', lambda x: Siahostdata(x)),
+                    self.__request('host/storage', lambda x: Siastoragedata(x)),
+                    self.__request('host/bandwidth', lambda x: Siatrafficdata(x)),
+                    self.__request_contracts(),
+                    self.__request('wallet', lambda x: Siawalletdata(x)))
             except ApiRequestFailedException:
                 self.msg.info('No summary created, host is not available.')
                 return
@@ -89,15 +99,16 @@ class Siahost(Plugin):
             await self.__wallet.summary(wallet, locked_collateral, risked_collateral)
             self.__autoprice.summary(storage, wallet, locked_collateral)
             self.__storage.summary(storage, traffic)
-            await self.__reports.summary(consensus, contracts, self.__scheduler.get_last_execution(self.__summary_job))
+            await self.__reports.summary(consensus, self.__scheduler.get_last_execution(self.__summary_job))
             await self.__reports.contract_list(consensus, contracts)
 
     async def list(self):
         with self.message_aggregator():
             try:
-                consensus = await self.__request('consensus', lambda x: Siaconsensusdata(x))
-                contracts = await self.__request('host/contracts', lambda x: Siacontractsdata(x))
-                wallet = await self.__request('wallet', lambda x: Siawalletdata(x))
+                consensus, contracts, wallet = await request_all(
+                    self.__request('consensus', lambda x: Siaconsensusdata(x)),
+                    self.__request_contracts(),
+                    self.__request('wallet', lambda x: Siawalletdata(x)))
             except ApiRequestFailedException:
                 self.msg.error('Report failed: some host queries failed.')
                 return
@@ -110,15 +121,16 @@ class Siahost(Plugin):
     async def accounting(self):
         with self.message_aggregator():
             try:
-                consensus = await self.__request('consensus', lambda x: Siaconsensusdata(x))
-                contracts = await self.__request('host/contracts', lambda x: Siacontractsdata(x))
+                consensus, _ = await request_all(
+                    self.__request('consensus', lambda x: Siaconsensusdata(x)),
+                    self.__request_contracts())
             except ApiRequestFailedException:
                 self.msg.error('Accounting failed: some host queries failed.')
                 return
 
             await self.__update_coinprice(Plugin.Channel.error, 'Autoprice incomplete: coin price not available.')
             await self.__blocks.update(consensus)
-            await self.__reports.accounting(consensus, contracts)
+            await self.__reports.accounting(consensus)
 
     async def price(self):
         with self.message_aggregator():
@@ -130,7 +142,7 @@ class Siahost(Plugin):
                 self.msg.error('Autoprice failed: some host queries failed.')
                 return
 
-            if not await self.__update_coinprice(Plugin.Channel.error, 'Autoprice failed: coin price not available.'):
+            if not await self.__update_coinprice(Plugin.Channel.error, 'Autoprice failed: coin price not available.', allow_fallback=False):
                 return
 
             await self.__autoprice.update(host)
@@ -138,33 +150,30 @@ class Siahost(Plugin):
     async def daychange(self):
         await self.__update_coinprice(Plugin.Channel.error, 'Coin price update failed: coin price not available.')
         try:
-            contracts = await self.__request('host/contracts', lambda x: Siacontractsdata(x))
+            consensus, contracts = await request_all(
+                self.__request('consensus', lambda x: Siaconsensusdata(x)),
+                self.__request_contracts())
         except ApiRequestFailedException:
             self.msg.error('Contract deadline update failed: some host queries failed.')
             return
         self.__health.update_proof_deadlines(contracts)
+        await self.__reports.close_days(consensus)
 
     @staticmethod
     def __get_collaterals(consensus, contracts):
-        height = consensus.height
-        locked_collateral = 0
-        risked_collateral = 0
-        for contract in contracts.contracts:
-            if contract.end <= height:
-                continue
-            locked_collateral += contract.locked_collateral
-            risked_collateral += contract.risked_collateral
-
-        return locked_collateral, risked_collateral
+        active = contracts.ending(consensus.height + 1)
+        return active.sum('locked_collateral'), active.sum('risked_collateral')
 
 
-    async def __update_coinprice(self, error_channel, error_message):
-        if not await self.__coinprice.update():
+    async def __update_coinprice(self, error_channel, error_message, allow_fallback=True):
+        if not await self.__coinprice.update() or not (allow_fallback or self.__coinprice.fresh):
             self.msg[error_channel](error_message)
             return False
-        else:
+        if self.__coinprice.fresh:
             self.__db.update_coinprice(self.__coinprice.price)
-            return True
+        else:
+            self.msg.debug(f'Coin price not available, using last known price of {self.__coinprice.price} {self.__coinprice.currency}.')
+        return True
 
     async def __request(self, cmd, generator):
         async with self.__api.create_session() as session:
@@ -174,3 +183,13 @@ class Siahost(Plugin):
                 return result
             except ApiRequestFailedException:
                 raise
+
+    async def __request_contracts(self):
+        # only contracts which can still change are requested, older ones are taken from the database
+        min_end = self.__db.get_contract_sync_height()
+        minimum = {'proofdeadline': min_end} if min_end is not None else None
+        async with self.__api.create_session() as session:
+            json = await self.__api.get_array(session, 'host/contracts', 'contracts', Siacontractsdata.fields, minimum)
+        contracts = Siacontractsdata(json)
+        self.__db.update_contract_list(contracts)
+        return contracts
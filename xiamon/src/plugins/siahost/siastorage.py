@@ -33,8 +33,8 @@ class Siastorage:
 
     def __get_traffic(self, traffic, reference_time):
         current_epoch = str(traffic.start)
+        last_timestamp, last_epoch, last_upload, last_download = self.__db.get_traffic(reference_time)
         self.__db.update_traffic(current_epoch, traffic.upload, traffic.download)
-        last_epoch, last_upload, last_download = self.__db.get_traffic(reference_time)
 
         if None in (last_epoch, last_upload, last_download):
             self.__plugin.msg.debug(
@@ -52,4 +52,4 @@ class Siastorage:
         download = traffic.download - last_download
         upload = traffic.upload - last_upload
 
-        return download, upload, (datetime.now() - reference_time)
+        return download, upload, (datetime.now() - last_timestamp)
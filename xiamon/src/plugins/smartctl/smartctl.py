@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-import os, subprocess, re
+import asyncio, os, subprocess, re
 from ...core import Plugin, Tablerenderer
 from .smartctldb import Smartctldb
 from .smartsnapshot import SmartSnapshot
@@ -18,6 +18,7 @@ class Smartctl(Plugin):
         binary_path = self.config.get('/usr/sbin/smartctl', 'binary')
         self.__smartctl_call = os.path.join(os.path.dirname(binary_path),f'./{os.path.basename(binary_path)}')
         self.__use_sudo = binary_path.startswith('/usr/sbin')
+        self.__timeout = self.config.get(60, 'smartctl_timeout')
 
         self.__db = Smartctldb(super(Smartctl, self), self.config.data['database'])
         self.__aggregation = timedelta(hours=self.config.get(24, 'aggregation'))
@@ -37,18 +38,21 @@ class Smartctl(Plugin):
         self.__scheduler.add_job(self.__check_job, self.run, self.config.get('0 * * * *', 'check_interval'))
         self.__scheduler.add_job(self.__report_job, self.report, self.config.get(None, 'report_interval'))
 
+    def close(self):
+        self.__db.close()
+
     async def startup(self):
         self.msg.debug(f'Monitored attributes: {", ".join(str(x) for x in self.__attributes_of_interest)}')
-        drives = self.__get_drives()
-        for device in drives:
-            identifier = self.__get_identifier(device)
+        loop = asyncio.get_event_loop()
+        # smartctl calls block, so the drives are probed in parallel in the default executor
+        probes = await asyncio.gather(*(loop.run_in_executor(None, self.__probe_drive, x) for x in sorted(self.__get_drives())))
+        for device, identifier, snapshot in probes:
             if identifier is None:
                 self.msg.debug(f'Drive {device} has no SMART support.')
                 continue
             if identifier in self.__blacklist:
                 self.msg.debug(f'Ignored blacklisted drive {identifier}.')
                 continue
-            snapshot = self.__get_smart_data(device, identifier)
             if not snapshot.success:
                 self.msg.debug(f'Drive {identifier} has no SMART support.')
                 self.__blacklist.add(identifier)
@@ -61,7 +65,7 @@ class Smartctl(Plugin):
 
     async def run(self):
         with self.message_aggregator():
-            for snapshot, evaluator in self.__get_snapshots():
+            for snapshot, evaluator in await self.__collect_snapshots():
                 history = self.__db.get(snapshot.identifier, datetime.now() - self.__aggregation)
                 self.__db.update(snapshot)
                 evaluator.check(snapshot, history)
@@ -71,7 +75,7 @@ class Smartctl(Plugin):
         attribute_columns = sorted(self.__attributes_of_interest)
         table = Tablerenderer(['Device', 'Alias'] + [str(x) for x in attribute_columns] )
 
-        for snapshot, evaluator in sorted(self.__get_snapshots(), key=lambda y: y[1].name):
+        for snapshot, evaluator in sorted(await self.__collect_snapshots(), key=lambda y: y[1].name):
             old_snapshot = self.__db.get(snapshot.identifier, last_execution)
 
             row = []
@@ -112,18 +116,43 @@ class Smartctl(Plugin):
             self.msg.debug(f'Found drive {evaluator.name} at {device} with {evaluator.config_type} limits.')
         return evaluator
 
-    def __get_snapshots(self):
+    async def __collect_snapshots(self):
+        # smartctl calls block, so they run in the default executor to keep the other jobs going
+        loop = asyncio.get_event_loop()
+        snapshots, timeouts = await loop.run_in_executor(None, self.__get_snapshots)
+        for device in timeouts:
+            self.msg.error(f'Smartctl did not answer within {self.__timeout} s for drive {device}.')
         result = []
+        for device, snapshot in snapshots:
+            result.append((snapshot, self.__add_drive(snapshot.identifier, device)))
+        return result
+
+    def __get_snapshots(self):
+        snapshots = []
+        timeouts = []
         for device in self.__get_drives():
-            identifier = self.__get_identifier(device)
-            if identifier is None or identifier in self.__blacklist:
+            try:
+                identifier = self.__get_identifier(device)
+                if identifier is None or identifier in self.__blacklist:
+                    continue
+                snapshot = self.__get_smart_data(device, identifier)
+            except subprocess.TimeoutExpired:
+                timeouts.append(device)
                 continue
-            snapshot = self.__get_smart_data(device, identifier)
             if not snapshot.success:
                 continue
 
-            result.append((snapshot, self.__add_drive(snapshot.identifier, device)))
-        return result
+            snapshots.append((device, snapshot))
+        return snapshots, timeouts
+
+    def __probe_drive(self, device):
+        try:
+            identifier = self.__get_identifier(device)
+            if identifier is None or identifier in self.__blacklist:
+                return device, identifier, None
+            return device, identifier, self.__get_smart_data(device, identifier)
+        except subprocess.TimeoutExpired:
+            return device, None, None
 
     def __get_identifier(self, device):
         output = self.__call_smartctl("-i", device)
@@ -152,4 +181,5 @@ class Smartctl(Plugin):
         else:
             call = [self.__smartctl_call, flag, device]
 
-        return subprocess.run(call, text=True, stdout=subprocess.PIPE)
+        # the child is killed on timeout, a dying drive can let smartctl hang for a long time
+        return subprocess.run(call, text=True, stdout=subprocess.PIPE, timeout=self.__timeout)
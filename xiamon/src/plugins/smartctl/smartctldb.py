@@ -1,6 +1,5 @@
-import sqlite3
-from pathlib import Path
 from datetime import datetime, timedelta
+from ...core import Database
 from .smartsnapshot import SmartSnapshot
 
 class Smartctldb():
@@ -29,41 +28,38 @@ class Smartctldb():
         );"""
     ]
 
+    __migrations = [
+        [
+            """CREATE INDEX IF NOT EXISTS snapshot_drive_timestamp ON snapshot(drive_id, timestamp);""",
+            """CREATE INDEX IF NOT EXISTS snapshot_timestamp ON snapshot(timestamp);""",
+            """CREATE INDEX IF NOT EXISTS attribute_snapshot ON attribute(snapshot_id);"""
+        ]
+    ]
+
     def __init__(self, plugin, file):
         self.__plugin = plugin
-        self.__path = Path(file)
-        if not self.__path.parent.exists():
-            raise FileNotFoundError(f'Path contains not existing directory: {file}')
-        self.__db = sqlite3.connect(self.__path)
-        cursor = self.__db.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
-        for cmd in self.__tables:
-            cursor.execute(cmd)
+        self.__db = Database(file, self.__tables, self.__migrations)
 
     def __del__(self):
+        self.close()
+
+    def close(self):
         self.__db.close()
 
     def update(self, snapshot):
         drive_command = """INSERT OR IGNORE INTO drive(name)
                         VALUES(?)"""
-        drive_id_command = "SELECT id FROM drive WHERE name == '{0}'"
-        snapshot_command = """INSERT INTO snapshot(drive_id, timestamp)
-                            VALUES(?,?)"""
-        snapshot_id_command = "SELECT last_insert_rowid()"
+        drive_id_command = "SELECT id FROM drive WHERE name == ?"
         attribute_command = """INSERT INTO attribute(snapshot_id, attribute, value)
                             VALUES(?,?,?)"""
 
-        cursor = self.__db.cursor()
-        cursor.execute(drive_command, (snapshot.identifier,))
-        drive_id = cursor.execute(drive_id_command.format(snapshot.identifier)).fetchall()[0][0]
-
-        cursor.execute(snapshot_command, (drive_id, int(datetime.now().timestamp())))
-        snapshot_id = cursor.execute(snapshot_id_command).fetchall()[0][0]
+        with self.__db.transaction():
+            self.__db.execute(drive_command, (snapshot.identifier,))
+            drive_id = self.__db.query(drive_id_command, (snapshot.identifier,))[0][0]
 
-        for id, value in snapshot.attributes.items():
-            cursor.execute(attribute_command, (snapshot_id, id, value))
+            snapshot_id = self.__db.insert_sample('snapshot', drive_id=drive_id)
 
-        self.__db.commit()
+            self.__db.executemany(attribute_command, ((snapshot_id, id, value) for id, value in snapshot.attributes.items()))
 
     def get(self, drive, timestamp, tolerance=timedelta(minutes=5)):
         snapshot_command = """SELECT snapshot.id, timestamp FROM snapshot
@@ -73,7 +69,7 @@ class Smartctldb():
         attribute_command = "SELECT attribute, value FROM attribute WHERE snapshot_id == ?"
 
         unix_timestamp = int((timestamp - tolerance).timestamp())
-        snapshot_rows = self.__get_rows(snapshot_command, (drive, unix_timestamp))
+        snapshot_rows = self.__db.query(snapshot_command, (drive, unix_timestamp))
 
         if snapshot_rows is None:
             self.__plugin.msg.debug(
@@ -82,7 +78,7 @@ class Smartctldb():
 
         real_timestamp = datetime.fromtimestamp(snapshot_rows[0][1])
         
-        attribute_rows = self.__get_rows(attribute_command, (snapshot_rows[0][0],))
+        attribute_rows = self.__db.query(attribute_command, (snapshot_rows[0][0],))
         if attribute_rows is None:
             self.__plugin.msg.debug(f'Failed to get snapshot from history: snapshot is empty.')
             return None
@@ -94,18 +90,6 @@ class Smartctldb():
                             WHERE timestamp < ?"""
         drive_command = """DELETE FROM drive
                         WHERE id not in (SELECT drive_id FROM snapshot)"""
-        cursor = self.__db.cursor()
-        cursor.execute(snapshot_command, (int(timestamp.timestamp()),))
-        cursor.execute(drive_command)
-        self.__db.commit()
-
-    def __get_rows(self, command, data=tuple()):
-        cursor = self.__db.cursor()
-        cursor.execute(command, data)
-        rows = cursor.fetchall()
-
-        if len(rows) == 0:
-            return None
-        return rows
-
-    
\ No newline at end of file
+        with self.__db.transaction():
+            self.__db.execute(snapshot_command, (int(timestamp.timestamp()),))
+            self.__db.execute(drive_command)
@@ -1,5 +1,5 @@
 import asyncio, aiohttp, datetime
-from ...core import Plugin, Conversions
+from ...core import Plugin, Conversions, Sessionpool, Retrypolicy, ApiRequestFailedException, ApiTransientException
 from .spacefarmersworker import SpacefarmersWorker
 
 class Spacefarmers(Plugin):
@@ -23,9 +23,10 @@ class Spacefarmers(Plugin):
         self.__last_check = scheduler.get_last_execution(self.__summary_job)
 
         self.__timeout = aiohttp.ClientTimeout(total=30)
+        self.__retry = Retrypolicy(deadline=90.0)
 
     async def startup(self):
-        async with aiohttp.ClientSession() as session:
+        async with Sessionpool.session('www.spacefarmers.io') as session:
             # offline tolerance might be longer than time since last summary,
             # so for correct offline detection, this extra check is necessary
             offline_check_duration = max(x.maximum_offline for x in self.__workers)
@@ -37,7 +38,7 @@ class Spacefarmers(Plugin):
 
     async def summary(self):
         last_summary = self.__scheduler.get_last_execution(self.__summary_job)
-        async with aiohttp.ClientSession() as session:
+        async with Sessionpool.session('www.spacefarmers.io') as session:
             stats_task = self.__get_stats(session)
             workers_task = self.__update_workers(session)
             earnings_task = self.__get_earnings(session, last_summary)
@@ -65,7 +66,7 @@ class Spacefarmers(Plugin):
             worker.reset_statistics()
 
     async def check(self):
-        async with aiohttp.ClientSession() as session:
+        async with Sessionpool.session('www.spacefarmers.io') as session:
             await self.__update_workers(session)
             for worker in self.__workers:
                 if not worker.online:
@@ -141,20 +142,28 @@ class Spacefarmers(Plugin):
         return Conversions.mojo_to_xch(earnings)
 
     async def __get(self, session, cmd, params = {}):
-        data = {}
+        try:
+            data = await self.__retry.run('www.spacefarmers.io', lambda: self.__request(session, cmd, params), self.msg.debug)
+        except ApiRequestFailedException as e:
+            self.alert(f'cmd_{cmd}', f'Request {cmd}: {str(e)}')
+            return None
+        self.reset_alert(f'cmd_{cmd}', f'Request {cmd} successful again.')
+        return data['data']
+
+    async def __request(self, session, cmd, params):
         try:
             request = f'https://www.spacefarmers.io/api/farmers/{self.__launcher_id}/{cmd}'
             async with session.get(request, params=params, timeout=self.__timeout) as response:
                 response.raise_for_status()
-                data =  await response.json()
-        except asyncio.TimeoutError as e_timeout:
-            self.alert(f'cmd_{cmd}', f'Request {cmd}: timeout')
-            return None
+                return await response.json()
+        except asyncio.TimeoutError:
+            raise ApiTransientException('timeout')
+        except aiohttp.ClientResponseError as e:
+            if e.status >= 500 or e.status == 429:
+                raise ApiTransientException(repr(e))
+            raise ApiRequestFailedException(repr(e))
         except Exception as e:
-            self.alert(f'cmd_{cmd}', f'Request {cmd}: {repr(e)}')
-            return None
-        self.reset_alert(f'cmd_{cmd}', f'Request {cmd} successful again.')
-        return data['data']
+            raise ApiTransientException(repr(e))
 
     class Partial:
         def __init__(self, json):
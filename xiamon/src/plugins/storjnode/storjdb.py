@@ -1,6 +1,5 @@
-import sqlite3
-from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import timedelta
+from ...core import Database
 
 class Storjdb():
     __tables = [
@@ -30,83 +29,72 @@ class Storjdb():
             storage integer NOT NULL
         );"""
     ]
-    __inserters = {
-        'node'    : """INSERT OR IGNORE INTO node(node)
-                        VALUES(?)""",
-        'balance' : """INSERT INTO balance(node_id, timestamp, balance)
-                        VALUES(?,?,?)""",
-        'traffic' : """INSERT INTO traffic(node_id, timestamp, upload, download, repair)
-                        VALUES(?,?,?,?,?)""",
-        'storage' : """INSERT INTO storage(node_id, timestamp, storage)
-                        VALUES(?,?,?)"""
-    }
-    __getters = {
-        'balance' : """SELECT balance FROM balance {0};""",
-        'traffic' : """SELECT upload, download, repair FROM traffic {0};""",
-        'storage' : """SELECT storage FROM storage {0};"""
+    __migrations = [
+        [
+            """CREATE INDEX IF NOT EXISTS balance_node_timestamp ON balance(node_id, timestamp);""",
+            """CREATE INDEX IF NOT EXISTS traffic_node_timestamp ON traffic(node_id, timestamp);""",
+            """CREATE INDEX IF NOT EXISTS storage_node_timestamp ON storage(node_id, timestamp);"""
+        ]
+    ]
+    __columns = {
+        'balance' : ('balance',),
+        'traffic' : ('upload', 'download', 'repair'),
+        'storage' : ('storage',)
     }
 
-    def __init__(self, file):
-        self.__path = Path(file)
-        if not self.__path.parent.exists():
-            raise FileNotFoundError(f'Path contains not existing directory: {file}')
-        self.__db = sqlite3.connect(self.__path)
-        cursor = self.__db.cursor()
-        for cmd in self.__tables:
-            cursor.execute(cmd)
+    def __init__(self, file, max_distance=timedelta(minutes=30)):
+        self.__db = Database(file, self.__tables, self.__migrations)
+        self.__max_distance = max_distance
+        self.__nodes = {}
 
     def __del__(self):
         self.__db.close()
 
     def update_balance(self, node, balance):
-        self.__add_row('balance', node, (int(datetime.now().timestamp()), balance))
+        self.__add_row('balance', node, balance=balance)
 
     def update_traffic(self, node, upload, download, repair):
-        self.__add_row('traffic', node, (int(datetime.now().timestamp()), upload, download, repair))
+        self.__add_row('traffic', node, upload=upload, download=download, repair=repair)
 
     def update_storage(self, node, storage):
-        self.__add_row('storage', node, (int(datetime.now().timestamp()), storage))
+        self.__add_row('storage', node, storage=storage)
 
     def get_balance(self, node, timestamp):
-        rows = self.__get_rows('balance', node, timestamp)
-        if rows is None:
-            return None
-        row = rows[len(rows)//2]
-        return row[0]
+        real_timestamp, row = self.__get_row('balance', node, timestamp)
+        if row is None:
+            return None, None
+        return real_timestamp, row[0]
 
     def get_traffic(self, node, timestamp):
-        rows = self.__get_rows('traffic', node, timestamp)
-        if rows is None:
-            return None, None, None
-        row = rows[len(rows)//2]
-        return row[0], row[1], row[2]
+        real_timestamp, row = self.__get_row('traffic', node, timestamp)
+        if row is None:
+            return None, None, None, None
+        return real_timestamp, row[0], row[1], row[2]
 
     def get_storage(self, node, timestamp):
-        rows = self.__get_rows('storage', node, timestamp)
-        if rows is None:
-            return None
-        row = rows[len(rows)//2]
-        return row[0]
-
-    def __add_row(self, table, node, data):
-        cursor = self.__db.cursor()
-        cursor.execute(self.__inserters['node'], (node,))
-        node_id = cursor.execute(f"SELECT id FROM node WHERE node == '{node}'").fetchall()[0][0]
-        cursor.execute(self.__inserters[table], (node_id, *data))
-        self.__db.commit()
+        real_timestamp, row = self.__get_row('storage', node, timestamp)
+        if row is None:
+            return None, None
+        return real_timestamp, row[0]
 
-    def __get_rows(self, table, node, timestamp):
-        cursor = self.__db.cursor()
-        node_id = cursor.execute(f"SELECT id FROM node WHERE node == '{node}'").fetchall()[0][0]
-        cursor.execute(self.__getters[table].format(self.__create_time_and_node_filter(node_id, timestamp)))
-        rows = cursor.fetchall()
+    def __add_row(self, table, node, **values):
+        with self.__db.transaction():
+            self.__db.insert_sample(table, node_id=self.__get_node_id(node, True), **values)
 
-        if len(rows) == 0:
-            return None
-        return rows
+    def __get_row(self, table, node, timestamp):
+        node_id = self.__get_node_id(node)
+        if node_id is None:
+            return None, None
+        return self.__db.nearest_sample(table, self.__columns[table], timestamp, self.__max_distance, node_id=node_id)
 
-    def __create_time_and_node_filter(self, node, timestamp, tolerance=timedelta(minutes=5)):
-        unix = int(timestamp.timestamp())
-        upper = unix + tolerance.total_seconds()
-        lower = unix - tolerance.total_seconds()
-        return f'WHERE node_id == {node} AND timestamp < {upper} AND timestamp > {lower}'
\ No newline at end of file
+    def __get_node_id(self, node, create=False):
+        node_id = self.__nodes.get(node, None)
+        if node_id is None:
+            if create:
+                self.__db.execute('INSERT OR IGNORE INTO node(node) VALUES(?);', (node,))
+            rows = self.__db.query('SELECT id FROM node WHERE node == ?;', (node,))
+            if rows is None:
+                return None
+            node_id = rows[0][0]
+            self.__nodes[node] = node_id
+        return node_id
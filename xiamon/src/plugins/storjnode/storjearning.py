@@ -21,11 +21,12 @@ class Storjearning:
                                               payout.current_month.repair_audit_reward,
                                               payout.current_month.held_reward)
             
+            _, last_earning = self.__db.get_balance(host.id, last_execution)
+
             self.__db.update_balance(host.id, earning)
 
             total_earning += earning
 
-            last_earning = self.__db.get_balance(host.id, last_execution)
             if last_earning is None:
                 verbose_table.add_row((host.name, f'{earning:.2f} USD', ''))
                 total_delta_earning_incomplete = True
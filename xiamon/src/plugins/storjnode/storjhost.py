@@ -1,9 +1,9 @@
 from ...core import Storjapi, Storjnodedata, Storjpayoutdata, ApiRequestFailedException
 
 class Storjhost:
-    def __init__(self, plugin, name, host):
+    def __init__(self, plugin, name, host, cache):
         self.__plugin = plugin
-        self.__api = Storjapi(host, self.__plugin)
+        self.__api = Storjapi(host, self.__plugin, cache)
         self.__name = name
         self.__id = None
 
@@ -13,9 +13,10 @@ class Storjhost:
     def __hash__(self):
         return hash(self.name)
 
-    async def check(self, session):
+    async def check(self):
         try:
-            data = Storjnodedata(await self.__api.get(session, 'sno/'))
+            async with self.__api.create_session() as session:
+                data = Storjnodedata(await self.__api.get(session, 'sno/'))
         except ApiRequestFailedException:
             self.__plugin.alert(f'{self.__name}_online', f"'{self.__name}': node healthcheck failed.")
             return
@@ -53,15 +54,17 @@ class Storjhost:
         else:
             self.__plugin.reset_alert(f'{self.__name}_overu', f"'{self.__name}' does no longer overuse storage.")
 
-    async def get_node_info(self, session):
-        info = Storjnodedata(await self.__api.get(session, 'sno/'))
+    async def get_node_info(self):
+        async with self.__api.create_session() as session:
+            info = Storjnodedata(await self.__api.get(session, 'sno/'))
         self.__id = info.id
         return info
     
-    async def get_payout_info(self, session):
-        if self.__id is None:
-            self.__id = Storjnodedata(await self.__api.get(session, 'sno/')).id
-        return Storjpayoutdata(await self.__api.get(session, 'sno/estimated-payout'))
+    async def get_payout_info(self):
+        async with self.__api.create_session() as session:
+            if self.__id is None:
+                self.__id = Storjnodedata(await self.__api.get(session, 'sno/')).id
+            return Storjpayoutdata(await self.__api.get(session, 'sno/estimated-payout'))
 
     @property
     def name(self):
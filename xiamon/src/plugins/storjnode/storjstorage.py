@@ -93,9 +93,9 @@ class Storjstorage:
         download_bandwidth = payout_data.current_month.egress_bandwidth
         upload_bandwidth = node_data.traffic - repair_audit_bandwidth - download_bandwidth
 
-        self.__db.update_traffic(node.id, upload_bandwidth, download_bandwidth, repair_audit_bandwidth)
+        last_timestamp, last_upload, last_download, last_repair = self.__db.get_traffic(node.id, reference_time)
 
-        last_upload, last_download, last_repair = self.__db.get_traffic(node.id, reference_time)
+        self.__db.update_traffic(node.id, upload_bandwidth, download_bandwidth, repair_audit_bandwidth)
 
         if None in (last_upload, last_download, last_repair):
             self.__plugin.msg.debug(
@@ -111,7 +111,7 @@ class Storjstorage:
         download_delta = download_bandwidth - last_download
         repair_delta = repair_audit_bandwidth - last_repair
 
-        return upload_delta, download_delta, repair_delta, (datetime.now() - reference_time)
+        return upload_delta, download_delta, repair_delta, (datetime.now() - last_timestamp)
     
     @staticmethod
     def __scale(traffic, duration):
@@ -0,0 +1,76 @@
+import asyncio, sqlite3
+from datetime import datetime, timedelta
+from src.core import Conversions, Coinpriceservice
+from src.plugins.chiawallet import chiawallet
+from src.plugins.chiawallet.chiawalletdb import Chiawalletdb
+
+class Scheduler:
+    def add_job(self, name, job, interval):
+        pass
+
+    def add_startup_job(self, name, job):
+        pass
+
+class Chiarpc:
+    balance = 2
+
+    def __init__(self, host, cert, key, plugin, cache=None):
+        pass
+
+    def create_session(self):
+        return Session()
+
+    async def post(self, session, cmd, input={}):
+        if cmd == 'get_sync_status':
+            return {'synced': True, 'syncing': False}
+        return {'wallet_balance': {'confirmed_wallet_balance': Conversions.xch_to_mojo(self.balance)}}
+
+class Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        pass
+
+async def unavailable(id, currency, log=None):
+    return None
+
+def create_plugin(tmp_path, monkeypatch, age):
+    database = tmp_path / 'db.sqlite'
+    Chiawalletdb(str(database))
+    connection = sqlite3.connect(database)
+    connection.execute('INSERT INTO balance(timestamp, balance, price) VALUES(?,?,?)',
+        (int((datetime.now() - age).timestamp()), Conversions.xch_to_mojo(1), 30.0))
+    connection.commit()
+    connection.close()
+
+    monkeypatch.setattr(chiawallet, 'Chiarpc', Chiarpc)
+    monkeypatch.setattr(Coinpriceservice, 'get', unavailable)
+    config = {'name': 'test_chiawallet', 'cert': None, 'key': None, 'database': str(database)}
+    return chiawallet.Chiawallet(config, Scheduler(), []), database
+
+def test_fallback_price_is_not_stored_again(tmp_path, monkeypatch):
+    plugin, database = create_plugin(tmp_path, monkeypatch, timedelta(days=2))
+    timestamp, _ = Chiawalletdb(str(database)).get_latest_price()
+
+    asyncio.run(plugin.check())
+
+    assert Chiawalletdb(str(database)).get_latest_price() == (timestamp, 30.0)
+    assert Chiawalletdb(str(database)).balance == 2
+
+def test_fallback_price_expires(tmp_path, monkeypatch):
+    plugin, database = create_plugin(tmp_path, monkeypatch, timedelta(days=2))
+    asyncio.run(plugin.check())
+
+    # the api stays down until the only stored price is older than the maximum age
+    connection = sqlite3.connect(database)
+    connection.execute('UPDATE balance SET timestamp = ? WHERE id == 1',
+        (int((datetime.now() - timedelta(days=8)).timestamp()),))
+    connection.commit()
+    connection.close()
+    monkeypatch.setattr(Chiarpc, 'balance', 3)
+    asyncio.run(plugin.check())
+
+    coinprice = chiawallet.Coinprice('chia', 'usd', Chiawalletdb(str(database)).get_latest_price)
+    assert not asyncio.run(coinprice.update())
+    assert coinprice.price is None
@@ -0,0 +1,37 @@
+import asyncio
+from aiohttp import web
+from src.core import Coinprice, Coinpriceservice, Sessionpool
+
+def test_failed_request_is_not_repeated_within_ttl(monkeypatch):
+    calls = []
+    messages = []
+
+    async def handler(request):
+        calls.append(request.query['ids'])
+        return web.Response(status=429)
+
+    async def main():
+        app = web.Application()
+        app.router.add_get('/api/v3/simple/price', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(Coinpriceservice, 'url', f'http://127.0.0.1:{port}/api/v3')
+        try:
+            coinprice = Coinprice('siacoin', 'usd', log=messages.append)
+            results = [await coinprice.update() for _ in range(3)]
+        finally:
+            await Sessionpool.close()
+            await runner.cleanup()
+        return results
+
+    monkeypatch.setattr(Coinpriceservice, '_Coinpriceservice__ids', set())
+    monkeypatch.setattr(Coinpriceservice, '_Coinpriceservice__currencies', set())
+    monkeypatch.setattr(Coinpriceservice, '_Coinpriceservice__prices', {})
+    monkeypatch.setattr(Coinpriceservice, '_Coinpriceservice__failed', None)
+
+    assert asyncio.run(main()) == [False, False, False]
+    assert calls == ['siacoin']
+    assert messages == ['Coinprice request failed: status 429']
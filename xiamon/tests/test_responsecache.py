@@ -0,0 +1,42 @@
+import asyncio
+from src.core import Responsecache
+
+def test_invalidate_drops_results_of_running_requests():
+    cache = Responsecache(60)
+    calls = []
+
+    async def main():
+        released = asyncio.Event()
+
+        async def request():
+            calls.append(1)
+            number = len(calls)
+            await released.wait()
+            return number
+
+        before = asyncio.ensure_future(cache.get('cmd', 'key', request))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        after = asyncio.ensure_future(cache.get('cmd', 'key', request))
+        await asyncio.sleep(0)
+        released.set()
+        assert await before == 1
+        assert await after == 2
+        assert await cache.get('cmd', 'key', request) == 2
+    asyncio.run(main())
+
+    assert len(calls) == 2
+
+def test_callers_get_their_own_copy():
+    cache = Responsecache(60)
+
+    async def request():
+        return {'contracts': [{'id': 1}]}
+
+    async def main():
+        first, second = await asyncio.gather(cache.get('cmd', 'key', request), cache.get('cmd', 'key', request))
+        first['contracts'][0]['id'] = 2
+        second['contracts'].clear()
+        return await cache.get('cmd', 'key', request)
+
+    assert asyncio.run(main()) == {'contracts': [{'id': 1}]}
@@ -0,0 +1,84 @@
+import asyncio, types
+import pytest
+from aiohttp import web
+from src.core import Retrypolicy, Circuitbreaker, Hostdapi, Siaapi, Sessionpool, ApiRequestFailedException, ApiTransientException, ApiNoAnswerException
+
+def create_counter(exception):
+    calls = []
+
+    async def request():
+        calls.append(1)
+        if exception is asyncio.TimeoutError:
+            await asyncio.sleep(10)
+        raise exception()
+    return calls, request
+
+def run_policy(host, exception, idempotent):
+    calls, request = create_counter(exception)
+    policy = Retrypolicy(attempts=3, base_delay=0.01, max_delay=0.01, deadline=0.5)
+
+    async def main():
+        with pytest.raises(ApiRequestFailedException):
+            await policy.run(host, request, lambda x: None, idempotent=idempotent)
+    asyncio.run(main())
+    return len(calls)
+
+def test_transient_errors_are_retried():
+    assert run_policy('retry-transient', ApiTransientException, True) == 3
+
+def test_timeout_of_non_idempotent_request_is_not_retried():
+    assert run_policy('retry-timeout', asyncio.TimeoutError, False) == 1
+
+def test_unanswered_requests_open_the_breaker():
+    for _ in range(Circuitbreaker.failure_threshold):
+        assert run_policy('retry-no-answer', ApiNoAnswerException, False) == 1
+    assert run_policy('retry-no-answer', ApiNoAnswerException, False) == 0
+
+def test_answered_failures_keep_the_breaker_closed():
+    for _ in range(Circuitbreaker.failure_threshold):
+        assert run_policy('retry-answered', ApiRequestFailedException, False) == 1
+    assert run_policy('retry-answered', ApiRequestFailedException, False) == 1
+
+def post_to_server(api_class, cmd, response):
+    calls = []
+    errors = []
+
+    async def handler(request):
+        calls.append(request.method)
+        return response(request)
+
+    async def main():
+        app = web.Application()
+        app.router.add_post(f'/{cmd}', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            plugin = types.SimpleNamespace(msg=types.SimpleNamespace(debug=lambda *x: None))
+            api = api_class(f'127.0.0.1:{port}', None, plugin)
+            async with api.create_session() as session:
+                try:
+                    await api.post(session, cmd, {'amount': 1})
+                except ApiRequestFailedException as e:
+                    errors.append(e)
+        finally:
+            await Sessionpool.close()
+            await runner.cleanup()
+    asyncio.run(main())
+    return calls, errors
+
+def test_failed_post_is_sent_once():
+    calls, errors = post_to_server(Siaapi, 'host/announce', lambda x: web.Response(status=500))
+    assert calls == ['POST']
+    assert len(errors) == 1 and not isinstance(errors[0], ApiNoAnswerException)
+
+def test_unanswered_post_is_sent_once():
+    def disconnect(request):
+        request.transport.close()
+        return web.Response()
+
+    calls, errors = post_to_server(Hostdapi, 'api/wallet/send', disconnect)
+    assert calls == ['POST']
+    assert len(errors) == 1 and isinstance(errors[0], ApiNoAnswerException)
@@ -0,0 +1,76 @@
+import asyncio, stat, time
+from datetime import datetime
+from src.plugins.smartctl.smartctl import Smartctl
+
+class Scheduler:
+    def add_job(self, name, job, interval):
+        pass
+
+    def add_startup_job(self, name, job):
+        pass
+
+    def get_last_execution(self, name):
+        return datetime.now()
+
+class Output:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, channel, sender, message):
+        self.messages.append((channel, message))
+
+def create_plugin(tmp_path, script):
+    binary = tmp_path / 'smartctl'
+    binary.write_text(f'#!/bin/sh\n{script}\n')
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    config = {
+        'name': 'test_smartctl',
+        'database': str(tmp_path / 'db.sqlite'),
+        'binary': str(binary),
+        'smartctl_timeout': 1
+    }
+    output = Output()
+    plugin = Smartctl(config, Scheduler(), [output])
+    plugin._Smartctl__get_drives = lambda: {'/dev/sdz'}
+    return plugin, output
+
+def test_hanging_smartctl_does_not_block_event_loop(tmp_path):
+    plugin, output = create_plugin(tmp_path, 'sleep 10')
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.1)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        start = time.monotonic()
+        await plugin.run()
+        duration = time.monotonic() - start
+        task.cancel()
+        return duration
+
+    duration = asyncio.run(main())
+    plugin.close()
+
+    assert duration < 5
+    assert len(ticks) >= 5
+    assert any(channel == Smartctl.Channel.error and '/dev/sdz' in message for channel, message in output.messages)
+
+def test_answering_smartctl_is_stored(tmp_path):
+    plugin, output = create_plugin(tmp_path, '\n'.join([
+        'if [ "$1" = "-i" ]; then',
+        '  echo "Device Model:     TEST DRIVE"',
+        '  echo "Serial Number:    1234"',
+        'else',
+        '  echo "ID# ATTRIBUTE_NAME FLAG VALUE WORST THRESH TYPE UPDATED WHEN_FAILED RAW_VALUE"',
+        '  echo "  5 Reallocated_Sector_Ct 0x0033 100 100 010 Pre-fail Always - 0"',
+        'fi'
+    ]))
+    plugin._Smartctl__attributes_of_interest.add(5)
+
+    asyncio.run(plugin.run())
+    plugin.close()
+
+    assert not any(channel == Smartctl.Channel.error for channel, _ in output.messages)
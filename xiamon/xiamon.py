@@ -2,9 +2,9 @@ import argparse, sys, os, shutil, yaml, asyncio, time
 import warnings
 from pytz_deprecation_shim import PytzUsageWarning
 
-from src.core import Scheduler
-from src.interfaces import *
-from src.plugins import *
+from src.core import Coinpriceservice, Config, Scheduler, Sessionpool
+from src.interfaces import available_interfaces
+from src.plugins import available_plugins
 
 __version__ = "1.4.0"
 
@@ -15,27 +15,6 @@ warnings.filterwarnings(
 
 prefix = '[xiamon] {0}'
 
-available_interfaces = {'discordbot': Discordbot,
-                        'logfile': Logfile,
-                        'stdout': Stdout}
-available_plugins = {'chiaharvester': Chiaharvester,
-                     'chiafarmer': Chiafarmer,
-                     'chianode': Chianode,
-                     'chiawallet': Chiawallet,
-                     'diskfree': Diskfree,
-                     'eccram': Eccram,
-                     'hostd': Hostd,
-                     'messagerelay': Messagerelay,
-                     'mqttlogger': Mqttlogger,
-                     'opendtu': Opendtu,
-                     'pingdrive': Pingdrive,
-                     'serviceping': Serviceping,
-                     'siahost' : Siahost,
-                     'smartctl': Smartctl,
-                     'spacefarmers': Spacefarmers,
-                     'storjnode': Storjnode,
-                     'sysmonitor': Sysmonitor}
-
 async def main():
     print(f'Xiamon {__version__}')
 
@@ -51,9 +30,12 @@ async def main():
         config = yaml.safe_load(stream)
     
     interfaces = []
+    interface_starts = []
     plugins = {}
+    timings = []
 
-    scheduler = Scheduler()
+    scheduler = Scheduler(Config(config).subconfig('scheduler'))
+    Coinpriceservice.configure(Config(config).subconfig('coinprice'))
 
     for key, value in config['interfaces'].items():
         if args.interface and key not in args.interface:
@@ -61,19 +43,27 @@ async def main():
             continue
         paths = [value] if isinstance(value, str) else value
         for path in paths:
-            check_item(key, available_interfaces)
-            interface = available_interfaces[key](get_config_path(path, args.config), scheduler)
-            await interface.start()
+            start = time.perf_counter()
+            interface = load_item(key, available_interfaces)(get_config_path(path, args.config), scheduler)
+            timings.append((f'interface {key} ({path})', time.perf_counter() - start))
             interfaces.append(interface)
+            interface_starts.append(start_interface(f'interface {key} ({path}) start', interface, timings))
+
+    await asyncio.gather(*interface_starts)
 
     for key, value in config['plugins'].items():
         paths = [value] if isinstance(value, str) else value
         for path in paths:
-            check_item(key, available_plugins)
-            plugin = available_plugins[key](get_config_path(path, args.config), scheduler, interfaces)
+            start = time.perf_counter()
+            plugin = load_item(key, available_plugins)(get_config_path(path, args.config), scheduler, interfaces)
+            timings.append((f'plugin {plugin.name}', time.perf_counter() - start))
             plugins[plugin.name] = plugin
 
+    start = time.perf_counter()
     await scheduler.start(interfaces)
+    timings.append(('startup jobs', time.perf_counter() - start))
+
+    print(prefix.format('Startup timing:\n' + '\n'.join(f'    {x}: {(y * 1000):.0f} ms' for x, y in timings)))
 
     if args.manual:
         for manual_job in args.manual:
@@ -82,16 +72,25 @@ async def main():
 
     print(prefix.format('Startup complete.'))
 
-    await schedule_plugins(scheduler)
+    try:
+        await scheduler.run()
+    finally:
+        for plugin in plugins.values():
+            plugin.close()
 
-async def schedule_plugins(scheduler):
-    while True:
-        sleep_time = await scheduler.run()
-        time.sleep(sleep_time)
+async def start_interface(name, interface, timings):
+    start = time.perf_counter()
+    await interface.start()
+    timings.append((name, time.perf_counter() - start))
 
-def check_item(item, available_items):
+def load_item(item, available_items):
     if item not in available_items:
         sys.exit(prefix.format(f'Error: Plugin or interface "{item}" is unknown.'))
+    imported = item in available_items.load_times
+    item_class = available_items.load(item)
+    if not imported:
+        print(prefix.format(f'Imported {item} in {(available_items.load_times[item] * 1000):.0f} ms.'))
+    return item_class
 
 def get_config_path(config, config_root_dir):
     subconfig_path = os.path.join(config_root_dir, config)
@@ -124,4 +123,5 @@ if __name__ == "__main__":
     try:
         loop.run_until_complete(main())
     finally:
+        loop.run_until_complete(Sessionpool.close())
         loop.close()